@@ -8,8 +8,6 @@ from pydantic import BaseModel
 from sqlmodel import Session
 
 from backend.api.deps import get_session_id
-from backend.core.llm.context_builder import build_context
-from backend.core.llm.intent_parser import build_config_from_llm_output, translate_policy
 from backend.db.database import engine
 from backend.db.models import OrchestrateJob, PolicyGenerationLog
 
@@ -34,6 +32,11 @@ def generate_policy(
     when calling POST /api/sim/run with policy_name="custom".
     """
     try:
+        # LLM client stack (openai/groq/pinecone) is imported on first use, not
+        # at app start — most workers never serve /generate.
+        from backend.core.llm.context_builder import build_context
+        from backend.core.llm.intent_parser import build_config_from_llm_output, translate_policy
+
         # 1. Load calibration data — strictly from DB (no local fallback)
         from backend.storage.storage import load_artifact
 
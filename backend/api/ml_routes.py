@@ -29,25 +29,28 @@ def get_model_metrics(session_id: str = Depends(get_session_id)):
     try:
         cal = load_artifact("calibration", session_id=session_id) or {}
 
-        from sqlmodel import Session, select
-
-        from backend.db.database import engine as db_engine
-        from backend.db.models import Employee
-
-        with Session(db_engine) as session:
-            employees = session.exec(
-                select(Employee).where(Employee.session_id == session_id)
-            ).all()
+        from backend.core.ml.attrition_model import load_data_from_db
+
+        # Only the five columns the recommendations read, as columns — not a
+        # full Employee object per row.
+        employees = load_data_from_db(
+            session_id,
+            columns=(
+                "work_life_balance",
+                "years_with_curr_manager",
+                "years_at_company",
+                "performance_rating",
+                "attrition",
+            ),
+        )
 
         attrition = cal.get("annual_attrition_rate", 0)
         stress_gain = cal.get("stress_gain_rate", 0)
 
-        if employees:
-            wlb = float(np.mean([e.work_life_balance for e in employees]))
-            mgr_years = float(
-                np.mean([getattr(e, "years_with_curr_manager", 0) for e in employees])
-            )
-            tenure = float(np.mean([e.years_at_company for e in employees]))
+        if not employees.empty:
+            wlb = float(employees["work_life_balance"].mean())
+            mgr_years = float(employees["years_with_curr_manager"].fillna(0).mean())
+            tenure = float(employees["years_at_company"].mean())
 
             auc_test = metrics.get("auc_roc", 1.0)
             cv_auc = metrics.get("cv_auc_mean", 1.0)
@@ -116,9 +119,9 @@ def get_model_metrics(session_id: str = Depends(get_session_id)):
                 )
 
             # --- Req: STAR ATTRITION Scenario ---
-            quitters = [e for e in employees if str(e.attrition).strip().lower() == "yes"]
-            if quitters:
-                avg_perf_quit = np.mean([getattr(e, "performance_rating", 3) for e in quitters])
+            quitters = employees["attrition"].astype(str).str.strip().str.lower() == "yes"
+            if quitters.any():
+                avg_perf_quit = employees.loc[quitters, "performance_rating"].fillna(3).mean()
                 if avg_perf_quit > 3.2:
                     star_rec = (
                         "**SCENARIO: STAR ATTRITION (HIGH PERFORMER LEAK)**\\n"
@@ -154,12 +157,11 @@ def explain_employee_shap(
     """
     from sqlmodel import Session, select
 
-    from backend.core.ml.attrition_model import engineer_features
+    from backend.core.ml.attrition_model import engineer_features, load_quit_model_artifact
     from backend.db.database import engine as db_engine
     from backend.db.models import Employee
-    from backend.storage.storage import load_artifact
 
-    saved = load_artifact("quit_model", session_id=session_id)
+    saved = load_quit_model_artifact(session_id=session_id)
     if not saved:
         raise HTTPException(status_code=404, detail="No trained model found.")
     base_model = saved["model"]
@@ -257,12 +259,11 @@ def get_global_feature_importance(session_id: str = Depends(get_session_id)):
     """
     from sqlmodel import Session, select
 
-    from backend.core.ml.attrition_model import engineer_features
+    from backend.core.ml.attrition_model import engineer_features, load_quit_model_artifact
     from backend.db.database import engine as db_engine
     from backend.db.models import Employee
-    from backend.storage.storage import load_artifact
 
-    saved = load_artifact("quit_model", session_id=session_id)
+    saved = load_quit_model_artifact(session_id=session_id)
     if not saved:
         raise HTTPException(status_code=404, detail="No trained model found.")
     base_model = saved["model"]
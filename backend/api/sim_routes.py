@@ -1,18 +1,42 @@
 # backend/api/sim_routes.py
 
 import uuid
+from typing import Literal
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from backend.api.deps import get_session_id
 from backend.core.simulation.policies import POLICIES
 
 router = APIRouter(prefix="/api/sim", tags=["Simulation"])
 
+# Sessions known to have a trained quit model. Artifacts are only ever
+# overwritten, never deleted, so once True a session stays ready and /run can
+# skip the DB round-trip.
+_model_ready_sessions: set[str] = set()
+
+
+def require_trained_model(session_id: str = Depends(get_session_id)) -> str:
+    """Dependency: 400 unless this session has a trained quit model."""
+    if session_id not in _model_ready_sessions:
+        from backend.storage.storage import artifact_exists
+
+        if not artifact_exists("quit_model", session_id):
+            raise HTTPException(status_code=400, detail="No trained model found.")
+        _model_ready_sessions.add(session_id)
+    return session_id
+
+
+# Built-in policy names plus "custom" (resolved from policy_log_id).
+# Validated by pydantic before the handler runs — unknown names get a 422.
+PolicyName = Literal[tuple(POLICIES) + ("custom",)]
+
 
 class SimulationRequest(BaseModel):
-    policy_name: str = "baseline"
+    model_config = ConfigDict(frozen=True)
+
+    policy_name: PolicyName = "baseline"
     runs: int = Field(default=10, ge=1, le=50)
     duration_months: int | None = Field(default=None, ge=1, le=24)
     seed: int | None = Field(default=42, ge=0)
@@ -20,13 +44,74 @@ class SimulationRequest(BaseModel):
 
 
 class CompareRequest(BaseModel):
-    policy_a: str = "baseline"
-    policy_b: str = "kpi_pressure"
+    model_config = ConfigDict(frozen=True)
+
+    policy_a: PolicyName = "baseline"
+    policy_b: PolicyName = "kpi_pressure"
     runs: int = Field(default=10, ge=1, le=50)
     duration_months: int | None = Field(default=None, ge=1, le=24)
     seed: int | None = Field(default=42, ge=0)
 
 
+def _find_reusable_job(
+    job_type: str,
+    policy_name: str,
+    runs: int,
+    duration_months: int | None,
+    seed: int | None,
+    policy_config: str | None,
+    session_id: str,
+):
+    """
+    Return an existing job with identical inputs that was started against the
+    current trained model, or None.
+
+    Results are deterministic for (policy, config, runs, duration, seed) and a
+    given model + calibration, so repeat clicks and re-opened comparisons can
+    reuse a stored job instead of re-running Monte Carlo. Only completed jobs
+    qualify: jobs run as in-process background tasks, so one whose worker was
+    restarted or timed out stays "running" forever and would be polled forever.
+    The "model version" is the latest training job: a new upload deletes the
+    session's jobs and queues a retrain, and anything created before that
+    retrain finished is never reused.
+    """
+    if seed is None:
+        return None
+
+    from sqlmodel import Session, select
+
+    from backend.db.database import engine
+    from backend.db.models import SimulationJob
+
+    with Session(engine) as session:
+        training = session.exec(
+            select(SimulationJob)
+            .where(SimulationJob.session_id == session_id, SimulationJob.job_type == "training")
+            .order_by(SimulationJob.created_at.desc())
+            .limit(1)
+        ).first()
+        if training is None or training.status != "completed":
+            return None
+
+        job = session.exec(
+            select(SimulationJob)
+            .where(
+                SimulationJob.session_id == session_id,
+                SimulationJob.job_type == job_type,
+                SimulationJob.policy_name == policy_name,
+                SimulationJob.runs == runs,
+                SimulationJob.duration_months == duration_months,
+                SimulationJob.seed == seed,
+                SimulationJob.policy_config == policy_config,
+                SimulationJob.status == "completed",
+                SimulationJob.created_at >= training.updated_at,
+            )
+            .order_by(SimulationJob.created_at.desc())
+            .limit(1)
+        ).first()
+    return job
+
+
 @router.get("/policies")
 def list_policies():
     return {"policies": list(POLICIES.keys())}
@@ -58,7 +143,7 @@ def get_test_data(session_id: str = Depends(get_session_id)):
 async def run_simulation_endpoint(
     request: SimulationRequest,
     background_tasks: BackgroundTasks,
-    session_id: str = Depends(get_session_id),
+    session_id: str = Depends(require_trained_model),
 ):
     import json
 
@@ -69,9 +154,6 @@ async def run_simulation_endpoint(
     from backend.storage.storage import load_artifact
     from backend.workers.tasks import run_simulation_task
 
-    if not load_artifact("quit_model", session_id):
-        raise HTTPException(status_code=400, detail="No trained model found.")
-
     quality = load_artifact("quality", session_id)
     if quality and not quality.get("simulation_reliable", True):
         raise HTTPException(
@@ -83,13 +165,14 @@ async def run_simulation_endpoint(
             ),
         )
 
+    # Existence check only — fetch one key, not every employee row.
     with Session(engine) as session:
-        if not session.exec(select(Employee).where(Employee.session_id == session_id)).all():
+        has_employees = session.exec(
+            select(Employee.employee_id).where(Employee.session_id == session_id).limit(1)
+        ).first()
+        if has_employees is None:
             raise HTTPException(status_code=400, detail="No employee data in database.")
 
-    if request.policy_name != "custom" and request.policy_name not in POLICIES:
-        raise HTTPException(status_code=400, detail=f"Unknown policy: {request.policy_name}")
-
     # Resolve custom policy config from DB
     resolved_policy_config: dict | None = None
     if request.policy_name == "custom":
@@ -107,6 +190,25 @@ async def run_simulation_endpoint(
             )
         resolved_policy_config = json.loads(log.generated_config)
 
+    policy_config_json = json.dumps(resolved_policy_config) if resolved_policy_config else None
+
+    reusable = _find_reusable_job(
+        "simulation",
+        request.policy_name,
+        request.runs,
+        request.duration_months,
+        request.seed,
+        policy_config_json,
+        session_id,
+    )
+    if reusable is not None:
+        return {
+            "job_id": reusable.job_id,
+            "poll_url": f"/api/sim/status/{reusable.job_id}",
+            "status": reusable.status,
+            "message": "Identical simulation already run on the current model. Reusing its result.",
+        }
+
     job_id = str(uuid.uuid4())
     with Session(engine) as session:
         session.add(
@@ -118,9 +220,7 @@ async def run_simulation_endpoint(
                 runs=request.runs,
                 duration_months=request.duration_months,
                 seed=request.seed,
-                policy_config=json.dumps(resolved_policy_config)
-                if resolved_policy_config
-                else None,
+                policy_config=policy_config_json,
                 policy_log_id=request.policy_log_id,
                 session_id=session_id,
             )
@@ -150,6 +250,7 @@ async def run_simulation_endpoint(
 def get_simulation_status(job_id: str, session_id: str = Depends(get_session_id)):
     import json
 
+    from fastapi.responses import ORJSONResponse
     from sqlmodel import Session
 
     from backend.db.database import engine
@@ -162,13 +263,19 @@ def get_simulation_status(job_id: str, session_id: str = Depends(get_session_id)
     # Bug #3 fix: prevent cross-user result leakage via guessed job UUIDs
     if job.session_id != session_id:
         raise HTTPException(status_code=403, detail="Access denied.")
+    # stdlib json for parsing: results are written with json.dumps, which may
+    # emit NaN — orjson.loads rejects that, while ORJSONResponse writes null.
     result = json.loads(job.result) if job.result else None
-    return {
-        "job_id": job_id,
-        "status": job.status,
-        "error": job.error,
-        "result": result,
-    }
+    # Returned as a Response so FastAPI skips jsonable_encoder's Python walk
+    # over every month/metric of the stored Monte Carlo result.
+    return ORJSONResponse(
+        {
+            "job_id": job_id,
+            "status": job.status,
+            "error": job.error,
+            "result": result,
+        }
+    )
 
 
 @router.post("/compare")
@@ -181,14 +288,8 @@ async def compare_policies(
 
     from backend.db.database import engine
     from backend.db.models import SimulationJob
-    from backend.workers.tasks import compare_simulations_task
-
-    if request.policy_a != "custom" and request.policy_a not in POLICIES:
-        raise HTTPException(status_code=400, detail=f"Unknown policy: {request.policy_a}")
-    if request.policy_b != "custom" and request.policy_b not in POLICIES:
-        raise HTTPException(status_code=400, detail=f"Unknown policy: {request.policy_b}")
-
     from backend.storage.storage import load_artifact
+    from backend.workers.tasks import compare_simulations_task
 
     quality = load_artifact("quality", session_id)
     if quality and not quality.get("simulation_reliable", True):
@@ -201,6 +302,23 @@ async def compare_policies(
             ),
         )
 
+    reusable = _find_reusable_job(
+        "comparison",
+        f"{request.policy_a}_vs_{request.policy_b}",
+        request.runs,
+        request.duration_months,
+        request.seed,
+        None,
+        session_id,
+    )
+    if reusable is not None:
+        return {
+            "job_id": reusable.job_id,
+            "poll_url": f"/api/sim/status/{reusable.job_id}",
+            "status": reusable.status,
+            "message": "Identical comparison already run on the current model. Reusing its result.",
+        }
+
     job_id = str(uuid.uuid4())
     with Session(engine) as session:
         session.add(
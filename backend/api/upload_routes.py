@@ -1,29 +1,38 @@
 # backend/api/upload_routes.py
 
-import io
 import json
 import uuid
+from typing import TYPE_CHECKING, BinaryIO
 
-import pandas as pd
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.api.deps import get_session_id
 from backend.db.database import engine, init_db
 from backend.db.models import SimulationJob
-from backend.schema import REQUIRED_COLUMNS, normalize_dataframe
-from backend.services.report_service import build_upload_report
-from backend.upload import ingest_from_dataframe
-from backend.workers.tasks import run_training_task
 
-# needed to bust lazy-load cache
+# pandas and the cleaning/ingest pipeline are imported inside the handlers
+# (same as sim_routes) so app start-up doesn't pay for them.
+if TYPE_CHECKING:
+    import pandas as pd
 
 router = APIRouter(prefix="/api/upload", tags=["Upload"])
 
 
-def _read_and_normalize(file_bytes: bytes) -> tuple[pd.DataFrame, bool]:
-    """Parse CSV bytes, normalize columns and return (df, overtime_was_present)."""
-    df = pd.read_csv(io.BytesIO(file_bytes))
+def _read_and_normalize(file_obj: BinaryIO) -> "tuple[pd.DataFrame, bool]":
+    """
+    Parse an uploaded CSV, normalize columns and return (df, overtime_was_present).
+
+    Reads straight from the upload's spooled temp file rather than
+    `await file.read()` + BytesIO, so the raw bytes are never held in memory
+    alongside the DataFrame. Blocking — call via run_in_threadpool.
+    """
+    import pandas as pd
+
+    from backend.schema import REQUIRED_COLUMNS, normalize_dataframe
+
+    df = pd.read_csv(file_obj)
     df, overtime_was_present = normalize_dataframe(df)
     missing_required = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing_required:
@@ -35,6 +44,35 @@ def _read_and_normalize(file_bytes: bytes) -> tuple[pd.DataFrame, bool]:
     return df, overtime_was_present
 
 
+def _ingest_and_reset_session(df: "pd.DataFrame", session_id: str) -> dict:
+    """
+    Replace the session's employees and drop its now-stale jobs/policy logs.
+    Blocking DB work — the async upload route runs it via run_in_threadpool so
+    a large ingest doesn't stall the event loop for every other request.
+    """
+    from sqlalchemy import text
+
+    from backend.upload import ingest_from_dataframe
+
+    init_db()
+    result = ingest_from_dataframe(df, session_id=session_id)
+    with Session(engine) as session:
+        session.exec(
+            text("DELETE FROM simulation_job WHERE session_id = :sid"),
+            params={"sid": session_id},
+        )
+        session.exec(
+            text("DELETE FROM orchestrate_job WHERE session_id = :sid"),
+            params={"sid": session_id},
+        )
+        session.exec(
+            text("DELETE FROM policy_generation_log WHERE session_id = :sid"),
+            params={"sid": session_id},
+        )
+        session.commit()
+    return result
+
+
 # ── Req #17: Pre-ingest validation endpoint ──────────────────────────────────
 
 
@@ -53,15 +91,16 @@ async def validate_dataset(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are accepted.")
 
-    contents = await file.read()
     try:
-        df, overtime_was_present = _read_and_normalize(contents)
+        df, overtime_was_present = await run_in_threadpool(_read_and_normalize, file.file)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {str(e)}")
 
-    report = build_upload_report(df, overtime_was_present)
+    from backend.services.report_service import build_upload_report
+
+    report = await run_in_threadpool(build_upload_report, df, overtime_was_present)
     df = report["df"]
     schema_report = report["schema_report"]
     quality_report = report["quality_report"]
@@ -99,16 +138,17 @@ async def upload_dataset(
         raise HTTPException(status_code=400, detail="Only CSV files are accepted.")
 
     # 2. Read CSV
-    contents = await file.read()
     try:
-        df, overtime_was_present = _read_and_normalize(contents)
+        df, overtime_was_present = await run_in_threadpool(_read_and_normalize, file.file)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {str(e)}")
 
     # 3. Schema report + clean
-    report = build_upload_report(df, overtime_was_present)
+    from backend.services.report_service import build_upload_report
+
+    report = await run_in_threadpool(build_upload_report, df, overtime_was_present)
     df = report["df"]
     schema_report = report["schema_report"]
     quality_report = report["quality_report"]
@@ -116,26 +156,9 @@ async def upload_dataset(
     junk_removed = report["junk_removed"]
     # issues stored in DB against job_id below
 
-    # 4. Ingest into DB (fast — no ML yet)
-    init_db()
+    # 4. Ingest into DB (no ML yet — training is queued below)
     try:
-        result = ingest_from_dataframe(df, session_id=session_id)
-        with Session(engine) as session:
-            from sqlalchemy import text
-
-            session.exec(
-                text("DELETE FROM simulation_job WHERE session_id = :sid"),
-                params={"sid": session_id},
-            )
-            session.exec(
-                text("DELETE FROM orchestrate_job WHERE session_id = :sid"),
-                params={"sid": session_id},
-            )
-            session.exec(
-                text("DELETE FROM policy_generation_log WHERE session_id = :sid"),
-                params={"sid": session_id},
-            )
-            session.commit()
+        result = await run_in_threadpool(_ingest_and_reset_session, df, session_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
 
@@ -168,6 +191,8 @@ async def upload_dataset(
         session.add(job)
         session.commit()
 
+    from backend.workers.tasks import run_training_task
+
     background_tasks.add_task(run_training_task, job_id, quality_report, session_id)
 
     return {
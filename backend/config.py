@@ -16,6 +16,14 @@ class Settings(BaseSettings):
     sentry_dsn_backend: str = ""
     environment: str = "development"
 
+    # Simulation worker processes per web worker (0 = an equal share of the
+    # available CPUs). Monte Carlo is CPU-bound, so it runs in a process pool
+    # instead of the request threadpool.
+    sim_workers: int = 0
+    # Web worker processes on this host, each with its own simulation pool.
+    # gunicorn_conf.py sets it; a bare `uvicorn` run is one worker.
+    web_concurrency: int = 1
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
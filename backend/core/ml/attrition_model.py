@@ -1,20 +1,19 @@
 # backend/ml/attrition_model.py
 
-
 import numpy as np
 import pandas as pd
+import xgboost as xgb
 from sklearn.isotonic import IsotonicRegression
 from sklearn.metrics import (
     accuracy_score,
     classification_report,
-    f1_score,
     precision_score,
     recall_score,
     roc_auc_score,
 )
-from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.preprocessing import LabelEncoder
-from sqlmodel import Session, select
+from sqlmodel import select
 from xgboost import XGBClassifier
 
 from backend.db.database import engine
@@ -63,12 +62,21 @@ FEATURES = BASE_FEATURES.copy()
 LABEL_ENCODERS: dict = {}
 
 
-def load_data_from_db(session_id: str = "global"):
-    with Session(engine) as session:
-        employees = session.exec(
-            select(Employee).where(Employee.session_id == session_id).order_by(Employee.employee_id)
-        ).all()
-    df = pd.DataFrame([e.model_dump() for e in employees])
+def load_data_from_db(session_id: str = "global", columns=None):
+    # Read rows straight into pandas — ML code only needs the column values,
+    # so building an Employee object and a model_dump() dict per row is waste.
+    # columns: optional Employee field names to project (default: every column),
+    # so callers that need a handful of fields don't pull whole rows.
+    # Only the uploaded workforce (simulation_id="master"), filtered in SQL so
+    # it is served by ix_employee_session_simulation.
+    entities = [getattr(Employee, col) for col in columns] if columns else [Employee]
+    query = (
+        select(*entities)
+        .where(Employee.session_id == session_id, Employee.simulation_id == "master")
+        .order_by(Employee.employee_id)
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql_query(query, conn)
     return df
 
 
@@ -76,7 +84,20 @@ def engineer_features(df: pd.DataFrame, encoders: dict = None) -> pd.DataFrame:
     """Create stronger signals from existing columns.
     encoders: pre-fitted LabelEncoders for inference (None = fit at training time).
     """
-    df["stagnation_score"] = df["years_since_last_promotion"] / (df["years_at_company"] + 1)
+
+    # Engineered ratios are computed on the raw float arrays — plain NumPy
+    # division, no intermediate Series or index alignment per expression.
+    # Called on every retrain, calibration and simulated month.
+    def _col(name: str) -> np.ndarray:
+        return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    years_at_company = _col("years_at_company")
+    total_working_years = _col("total_working_years")
+    job_level = _col("job_level")
+    tenure_denom = years_at_company + 1
+    career_denom = total_working_years + 1
+
+    df["stagnation_score"] = _col("years_since_last_promotion") / tenure_denom
     sat_cols = ["job_satisfaction", "work_life_balance", "environment_satisfaction"]
     if "job_involvement" in df.columns:
         sat_cols.append("job_involvement")
@@ -84,13 +105,13 @@ def engineer_features(df: pd.DataFrame, encoders: dict = None) -> pd.DataFrame:
         sat_cols.append("performance_rating")
     df["satisfaction_composite"] = df[sat_cols].mean(axis=1)
 
-    df["career_velocity"] = df["job_level"] / (df["total_working_years"] + 1)
-    df["loyalty_index"] = df["years_at_company"] / (df["total_working_years"] + 1)
+    df["career_velocity"] = job_level / career_denom
+    df["loyalty_index"] = years_at_company / career_denom
 
     # Engineered: flag underpaid employees (lower income relative to job level)
-    df["income_vs_level"] = df["monthly_income"] / (df["job_level"] * 1000 + 1)
+    df["income_vs_level"] = _col("monthly_income") / (job_level * 1000 + 1)
     # Engineered: manager tenure relative to company tenure (instability indicator)
-    df["tenure_stability"] = df["years_with_curr_manager"] / (df["years_at_company"] + 1)
+    df["tenure_stability"] = _col("years_with_curr_manager") / tenure_denom
 
     # Label-encode categorical features.
     # Training (encoders=None): fit + register in LABEL_ENCODERS global.
@@ -102,14 +123,18 @@ def engineer_features(df: pd.DataFrame, encoders: dict = None) -> pd.DataFrame:
     for col, enc_col in cat_cols:
         if col not in df.columns or df[col].isna().all():
             continue
+        # Work on the category levels, not the rows: str() and the class lookup
+        # run once per distinct department/role, then broadcast via the codes.
+        values = df[col].fillna("Unknown").astype("category")
+        levels = values.cat.categories.astype(str)
         if encoders and enc_col in encoders:
             le = encoders[enc_col]
-            mapping = {cls: i for i, cls in enumerate(le.classes_)}
-            df[enc_col] = df[col].fillna("Unknown").astype(str).map(mapping).fillna(-1).astype(int)
         else:
-            le = LabelEncoder()
-            df[enc_col] = le.fit_transform(df[col].fillna("Unknown").astype(str))
+            le = LabelEncoder().fit(levels)
             LABEL_ENCODERS[enc_col] = le
+        # Unseen levels at inference -> -1, same as before.
+        level_codes = pd.Index(le.classes_).get_indexer(levels)
+        df[enc_col] = level_codes[values.cat.codes.to_numpy()].astype(int)
 
     return df
 
@@ -121,14 +146,47 @@ def get_active_features(df: pd.DataFrame) -> list[str]:
     """
     features = BASE_FEATURES.copy()
 
-    for opt in OPTIONAL_FEATURES:
-        if opt in df.columns and df[opt].std() > 0:
+    # "Has signal" only means non-constant: one columnar nunique() call over all
+    # present optional columns instead of a full std() pass per column.
+    present = [opt for opt in OPTIONAL_FEATURES if opt in df.columns]
+    has_signal = df[present].nunique(dropna=True) > 1
+    for opt, keep in has_signal.items():
+        if keep:
             features.append(opt)
             print(f"  >> Bonus feature '{opt}' found with signal - added to model")
 
     return features
 
 
+def load_training_frame(session_id: str = "global") -> pd.DataFrame:
+    """
+    Employees for this session with the target mapped to 0/1 and engineered
+    features added. Fitted label encoders are (re)registered in LABEL_ENCODERS.
+    """
+    print("=== Loading data from database...")
+
+    df = load_data_from_db(session_id=session_id)
+    print("Rows loaded from DB:", len(df))
+
+    df = df.drop(columns=["employee_id", "simulation_id", "session_id"], errors="ignore")
+    print("After column drop:", len(df))
+
+    # df = df.drop_duplicates()
+    # print("After duplicate removal:", len(df))
+
+    df[TARGET] = df[TARGET].map({"Yes": 1, "No": 0})
+    df = df.dropna(subset=[TARGET])
+    print(f"  >> {len(df)} employees loaded")
+
+    return engineer_features(df)
+
+
+# Every booster below pins tree_method="hist" (max_bin=256) rather than relying
+# on the installed XGBoost's default: features are quantised once into uint8
+# bins, and the sklearn wrapper then trains (and early-stops) on a
+# QuantileDMatrix instead of re-sorting raw float columns.
+
+
 # Minimum precision floor for the recall-optimised threshold tuner.
 # At 0.50: for every 10 flagged employees, at least 5 are real quitters.
 # Raised from 0.30 → 0.50 after calibration improved precision significantly.
@@ -136,32 +194,49 @@ def get_active_features(df: pd.DataFrame) -> list[str]:
 MIN_PRECISION_FLOOR = 0.50
 
 
-def tune_threshold(model, X_val, y_val) -> float:
+def tune_threshold(model, X_val, y_val, probs: np.ndarray | None = None) -> float:
     """
     CEO-optimised: maximise Quits recall while precision >= MIN_PRECISION_FLOOR.
     Falls back to best-F1 threshold if the precision floor can never be satisfied.
+    probs: already-computed P(quit) for X_val — skips re-predicting the val set.
     """
-    probs = model.predict_proba(X_val)[:, 1]
-    best_threshold = 0.5
-    best_recall = 0.0
+    if probs is None:
+        probs = model.predict_proba(X_val)[:, 1]
+    y_true = np.asarray(y_val, dtype=np.int64)
+
+    # Score every candidate threshold at once from sorted scores: "how many rows
+    # score above t" is a binary search into the sorted array, so the counts for
+    # all thresholds cost O(N log N) — no (thresholds × rows) matrix, no Python
+    # loop of sklearn metric calls.
+    thresholds = np.arange(0.05, 0.85, 0.01)
+    all_sorted = np.sort(probs)
+    pos_sorted = np.sort(probs[y_true == 1])
+    n_pos = len(pos_sorted)
+    n_pred = len(all_sorted) - np.searchsorted(all_sorted, thresholds, side="right")
+    tp = n_pos - np.searchsorted(pos_sorted, thresholds, side="right")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prec = np.where(n_pred > 0, tp / n_pred, 0.0)
+        rec = tp / n_pos if n_pos else np.zeros(len(thresholds))
+        f1 = np.where(n_pred + n_pos > 0, 2 * tp / (n_pred + n_pos), 0.0)
+
+    # Same selection rules as the original sweep: skip thresholds that flag no
+    # one, keep the FIRST threshold reaching the best score (strict improvement).
+    flagged = n_pred > 0
     fallback_threshold = 0.5
     fallback_f1 = 0.0
+    f1_masked = np.where(flagged, f1, 0.0)
+    if f1_masked.max() > 0:
+        i = int(np.argmax(f1_masked))
+        fallback_threshold = round(float(thresholds[i]), 2)
+        fallback_f1 = float(f1_masked[i])
 
-    for t in np.arange(0.05, 0.85, 0.01):
-        preds = (probs > t).astype(int)
-        if preds.sum() == 0:
-            continue
-        prec = precision_score(y_val, preds, zero_division=0)
-        rec = recall_score(y_val, preds, zero_division=0)
-        f1 = f1_score(y_val, preds, zero_division=0)
-
-        if f1 > fallback_f1:
-            fallback_f1 = f1
-            fallback_threshold = round(t, 2)
-
-        if prec >= MIN_PRECISION_FLOOR and rec > best_recall:
-            best_recall = rec
-            best_threshold = round(t, 2)
+    best_threshold = 0.5
+    best_recall = 0.0
+    rec_masked = np.where(flagged & (prec >= MIN_PRECISION_FLOOR), rec, 0.0)
+    if rec_masked.max() > 0:
+        i = int(np.argmax(rec_masked))
+        best_threshold = round(float(thresholds[i]), 2)
+        best_recall = float(rec_masked[i])
 
     if best_recall == 0.0:
         best_threshold = fallback_threshold
@@ -178,27 +253,27 @@ def tune_threshold(model, X_val, y_val) -> float:
     return best_threshold
 
 
-def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "global"):
-    global FEATURES
-
-    print("=== Loading data from database...")
-
-    df = load_data_from_db(session_id=session_id)
-    print("Rows loaded from DB:", len(df))
+def load_quit_model_artifact(session_id: str = "global") -> dict | None:
+    """
+    load_artifact("quit_model") with the booster rebuilt into an XGBClassifier
+    under "model", so callers see the same payload shape as before. Payloads
+    saved before the native format (pickled "model") are returned unchanged.
+    """
+    from backend.storage.storage import load_artifact
 
-    df = df.drop(columns=["employee_id", "simulation_id", "session_id"], errors="ignore")
-    print("After column drop:", len(df))
+    saved = load_artifact("quit_model", session_id=session_id)
+    if saved and "model_ubj" in saved:
+        base_model = XGBClassifier()
+        base_model.load_model(bytearray(saved.pop("model_ubj")))
+        saved["model"] = base_model
+    return saved
 
-    # df = df.drop_duplicates()
-    # print("After duplicate removal:", len(df))
 
-    df[TARGET] = df[TARGET].map({"Yes": 1, "No": 0})
-    df = df.dropna(subset=[TARGET])
+def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "global"):
+    global FEATURES
 
+    df = load_training_frame(session_id=session_id)
     n_samples = len(df)
-    print(f"  >> {n_samples} employees loaded")
-
-    df = engineer_features(df)
 
     # Determine which features to use based on this dataset
     FEATURES = get_active_features(df)
@@ -212,14 +287,20 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
         + ")"
     )
 
-    X = df[FEATURES]
-    y = df[TARGET]
+    # float32: XGBoost bins on float32 internally, so this is lossless for the
+    # model but halves X's footprint and skips a float64→float32 conversion copy
+    # on every fit/predict below (early-stop, refit, calibration, 5-fold CV).
+    # Plain contiguous NumPy arrays rather than DataFrames, so the splits, fits
+    # and predicts below skip pandas column extraction and index handling.
+    X = df[FEATURES].to_numpy(dtype=np.float32)
+    y = df[TARGET].to_numpy(dtype=np.int8)
 
     # Basic sanity check: need both classes for a meaningful classifier.
-    class_counts = y.value_counts()
-    if len(class_counts) < 2:
+    classes, counts = np.unique(y, return_counts=True)
+    if len(classes) < 2:
+        class_counts = dict(zip(classes.tolist(), counts.tolist()))
         raise ValueError(
-            f"Training data contains only a single attrition class: {class_counts.to_dict()}. "
+            f"Training data contains only a single attrition class: {class_counts}. "
             "At least some 'Yes' and 'No' rows are required to train the quit probability model."
         )
 
@@ -252,22 +333,6 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
         )
     imbalance_ratio = round(negative / positive, 1)
 
-    # Quick CV to decide imbalance strategy
-    capped_spw_quick = round(min(np.sqrt(imbalance_ratio), 10.0), 2)
-    quick_model = XGBClassifier(
-        n_estimators=50,
-        max_depth=max_depth,
-        learning_rate=0.05,
-        scale_pos_weight=capped_spw_quick,
-        random_state=42,
-        eval_metric="auc",
-        verbosity=0,
-    )
-    # For very small datasets, ensure class counts support the chosen number of folds.
-    min_class_count = min(negative, positive)
-    quick_cv_folds = max(2, min(3, min_class_count))  # 2–3 folds
-    cross_val_score(quick_model, X_train, y_train, cv=quick_cv_folds, scoring="roc_auc")
-
     # -- Imbalance strategy: cost-sensitive learning --
     # scale_pos_weight is derived from the actual class ratio in THIS dataset.
     # It changes per uploaded dataset (data-driven, not hardcoded).
@@ -297,6 +362,8 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
         random_state=42,
         eval_metric="auc",
         early_stopping_rounds=50,
+        tree_method="hist",
+        max_bin=256,
         verbosity=0,
     )
     _early_stop_model.fit(X_train_final, y_train_final, eval_set=[(X_val, y_val)], verbose=False)
@@ -319,9 +386,14 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
         max_delta_step=1,
         random_state=42,
         eval_metric="auc",
+        tree_method="hist",
+        max_bin=256,
         verbosity=0,
     )
     base_model.fit(X_train_final, y_train_final)
+    # Trained on a bare array — restore the column names so inference on
+    # df[features] DataFrames is still checked against the training features.
+    base_model.get_booster().feature_names = list(FEATURES)
 
     # Step 3 — Calibrate probabilities using val set (isotonic regression)
     # scale_pos_weight distorts raw XGBoost probabilities — the model learns ranking
@@ -351,7 +423,10 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
     )
 
     print("--- Tuning decision threshold on validation set...")
-    best_threshold = tune_threshold(model, X_val, y_val)
+    # Val-set probabilities = the calibrator applied to the raw scores it was just
+    # fitted on — no second pass of every tree over X_val.
+    val_probs = calibrator.predict(raw_val_probs)
+    best_threshold = tune_threshold(model, X_val, y_val, probs=val_probs)
 
     test_probs = model.predict_proba(X_test)[:, 1]
     y_pred_test = (test_probs > best_threshold).astype(int)
@@ -382,20 +457,22 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
     # Cross-validation on base (uncalibrated) model — calibration doesn't affect AUC ranking,
     # only probability values, so CV on base model gives the true signal strength estimate.
     print("\n=== Cross-Validation Diagnostic (5-fold on full data):")
-    cv_model = XGBClassifier(
-        n_estimators=best_iter,
-        max_depth=max_depth,
-        learning_rate=0.02,
-        subsample=0.8,
-        colsample_bytree=0.8,
-        min_child_weight=5,  # kept in sync with main model
-        reg_alpha=1.0,
-        reg_lambda=2.0,
-        max_delta_step=1,
-        random_state=42,
-        eval_metric="auc",
-        verbosity=0,
-    )
+    cv_params = {
+        "objective": "binary:logistic",
+        "max_depth": max_depth,
+        "eta": 0.02,
+        "subsample": 0.8,
+        "colsample_bytree": 0.8,
+        "min_child_weight": 5,  # kept in sync with main model
+        "alpha": 1.0,
+        "lambda": 2.0,
+        "max_delta_step": 1,
+        "seed": 42,
+        "eval_metric": "auc",
+        "tree_method": "hist",
+        "max_bin": 256,
+        "verbosity": 0,
+    }
     # Subsample if dataset is too large to prevent OOM on Cloud Run
     X_cv, y_cv = X, y
     if len(X_cv) > 50000:
@@ -404,17 +481,28 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
         )
         _, X_cv, _, y_cv = train_test_split(X, y, test_size=50000, random_state=42, stratify=y)
 
+    # Native xgb.cv: one DMatrix (binned once) shared by all 5 folds, boosted
+    # round-by-round on XGBoost's own thread pool — no per-fold sklearn
+    # conversion or DMatrix rebuild as with cross_val_score. Same stratified,
+    # shuffled splits as before.
     cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-    cv_scores = cross_val_score(cv_model, X_cv, y_cv, cv=cv, scoring="roc_auc")
-    print(f"  AUC per fold: {[round(s, 4) for s in cv_scores]}")
-    print(f"  Mean AUC:     {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+    cv_out = xgb.cv(
+        cv_params,
+        xgb.DMatrix(X_cv, label=y_cv, feature_names=FEATURES),
+        num_boost_round=best_iter,
+        folds=list(cv.split(X_cv, y_cv)),
+        metrics="auc",
+        as_pandas=True,
+    )
+    cv_mean = float(cv_out["test-auc-mean"].iloc[-1])
+    cv_std = float(cv_out["test-auc-std"].iloc[-1])
+    print(f"  Mean AUC:     {cv_mean:.4f} ± {cv_std:.4f}")
 
-    if cv_scores.mean() < 0.65:
+    if cv_mean < 0.65:
         print("  ---  WARNING: Low AUC - features may lack predictive signal for this dataset.")
-    if cv_scores.std() > 0.05:
+    if cv_std > 0.05:
         print("  ---  WARNING: High variance across folds - model reliability is unstable.")
 
-    cv_mean = float(cv_scores.mean())
     # Calculate Global Feature Importance
     importances = model.feature_importances_
     pairs = sorted(zip(FEATURES, importances.tolist()), key=lambda x: x[1], reverse=True)
@@ -451,7 +539,7 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
     quality_report = {
         "auc_roc": round(float(auc), 4),
         "cv_auc_mean": round(cv_mean, 4),
-        "cv_auc_std": round(float(cv_scores.std()), 4),
+        "cv_auc_std": round(cv_std, 4),
         "test_accuracy": round(float(test_accuracy), 4),
         "train_accuracy": round(float(train_accuracy), 4),
         "test_recall": round(float(test_recall), 4),
@@ -485,8 +573,11 @@ def train_attrition_model(pre_clean_metrics: dict = None, session_id: str = "glo
         quality_report["trust_score"] = 100
         quality_report["cleaning_audit"] = []
 
+    # The booster goes in as XGBoost's native UBJSON bytes rather than a pickled
+    # XGBClassifier: loads via XGBoost's own C++ deserializer and stays readable
+    # across XGBoost upgrades (xgboost is unpinned). See load_quit_model_artifact.
     model_payload = {
-        "model": model.base_model,
+        "model_ubj": bytes(model.base_model.get_booster().save_raw("ubj")),
         "calibrator": model.calibrator,
         "threshold": best_threshold,
         "features": FEATURES,
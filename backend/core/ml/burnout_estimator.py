@@ -1,11 +1,13 @@
 # backend/ml/burnout_estimator.py
 
+import numpy as np
 
-import pandas as pd
-from sqlmodel import Session, select
-
-from backend.db.database import engine
-from backend.db.models import Employee
+# Threshold rule constants — shared by the scalar and array forms below.
+BASE_THRESHOLD = 0.3
+LEVEL_WEIGHT = 0.08
+EXPERIENCE_WEIGHT = 0.02
+EXPERIENCE_CAP_YEARS = 20
+MAX_THRESHOLD = 0.85
 
 
 def burnout_threshold(job_level: int, total_working_years: float) -> float:
@@ -13,29 +15,29 @@ def burnout_threshold(job_level: int, total_working_years: float) -> float:
     Returns a burnout threshold between 0.0 and 1.0
     Higher job level and experience = higher tolerance
     """
-    base_threshold = 0.3
-    level_weight = 0.08
-    experience_weight = 0.02
-
-    threshold = base_threshold
-    threshold += (job_level - 1) * level_weight
-    threshold += min(total_working_years, 20) * experience_weight
+    threshold = BASE_THRESHOLD
+    threshold += (job_level - 1) * LEVEL_WEIGHT
+    threshold += min(total_working_years, EXPERIENCE_CAP_YEARS) * EXPERIENCE_WEIGHT
 
-    return round(min(threshold, 0.85), 3)
+    return round(min(threshold, MAX_THRESHOLD), 3)
 
 
-def load_data_from_db(session_id: str = "global"):
-    with Session(engine) as session:
-        employees = session.exec(select(Employee).where(Employee.session_id == session_id)).all()
-    df = pd.DataFrame([e.model_dump() for e in employees])
-    return df
+def burnout_thresholds(job_levels, total_working_years) -> np.ndarray:
+    """
+    Array form of burnout_threshold for whole employee columns — one pass of
+    NumPy arithmetic instead of a Python call per employee. Same values as the
+    scalar form, element for element.
+    """
+    job_levels = np.asarray(job_levels, dtype=np.float64)
+    years = np.minimum(np.asarray(total_working_years, dtype=np.float64), EXPERIENCE_CAP_YEARS)
+    threshold = BASE_THRESHOLD + (job_levels - 1) * LEVEL_WEIGHT + years * EXPERIENCE_WEIGHT
+    return np.round(np.minimum(threshold, MAX_THRESHOLD), 3)
 
 
 def train_burnout_estimator(session_id: str = "global"):
-    print("=== Loading data from database...")
-    load_data_from_db(session_id=session_id)
-
-    print("\n=== Sample Thresholds:")
+    # The threshold is a closed-form rule of job level and experience — nothing
+    # is fitted, so there is no employee table to read here.
+    print("=== Sample Thresholds:")
     print(f"  Junior L1 (1yr)    : {burnout_threshold(1, 1)}")
     print(f"  Mid    L2 (5yr)    : {burnout_threshold(2, 5)}")
     print(f"  Senior L3 (10yr)   : {burnout_threshold(3, 10)}")
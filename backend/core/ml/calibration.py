@@ -2,111 +2,105 @@
 
 
 import numpy as np
-import pandas as pd
-from sqlmodel import Session, select
 
-from backend.core.ml.attrition_model import engineer_features
-from backend.core.ml.burnout_estimator import burnout_threshold
-from backend.db.database import engine
-from backend.db.models import Employee
+from backend.core.ml.attrition_model import engineer_features, load_data_from_db
+from backend.core.ml.burnout_estimator import burnout_thresholds
+
+# Employee columns calibration reads: model inputs for engineer_features (incl.
+# department / job_role for the encoded features) plus the attrition label.
+_CALIBRATION_COLUMNS = (
+    "job_satisfaction",
+    "work_life_balance",
+    "environment_satisfaction",
+    "job_involvement",
+    "monthly_income",
+    "years_at_company",
+    "total_working_years",
+    "num_companies_worked",
+    "job_level",
+    "years_since_last_promotion",
+    "years_with_curr_manager",
+    "performance_rating",
+    "stock_option_level",
+    "age",
+    "distance_from_home",
+    "percent_salary_hike",
+    "years_in_current_role",
+    "marital_status",
+    "overtime",
+    "department",
+    "job_role",
+    "attrition",
+)
+
+
+def _to_monthly(p):
+    """Annual quit probability -> the equivalent monthly hazard. Works on scalars and arrays."""
+    return 1.0 - np.power(1.0 - p, 1.0 / 12.0)
 
 
 def calibrate(stress_amplification_override=None, session_id: str = "global"):
     print("=== Running simulation calibration...")
 
-    with Session(engine) as session:
-        employees = session.exec(
-            select(Employee).where(Employee.session_id == session_id).order_by(Employee.employee_id)
-        ).all()
+    # One column projection straight into pandas — calibration only reads these
+    # values, so no Employee objects or per-row dicts are built.
+    df_all = load_data_from_db(session_id, columns=_CALIBRATION_COLUMNS)
 
-    if not employees:
+    if df_all.empty:
         raise ValueError("No employees found in database. Run upload/ingest first.")
 
-    from backend.storage.storage import load_artifact
+    # Same per-session cache the simulation engine uses: the model is decoded
+    # from the DB once here and reused by every empirical calibration run below,
+    # instead of calibrate() and the engine each unpickling their own copy.
+    # run_training_job clears this cache right after training, so it is fresh.
+    from backend.core.simulation.agent import _get_quit_model
 
-    _saved = load_artifact("quit_model", session_id=session_id)
-    if not _saved:
+    try:
+        _saved = _get_quit_model(session_id=session_id)
+    except FileNotFoundError:
         raise ValueError(
             "Quit probability model not found in DB. "
             "Train the attrition model before running calibration."
-        )
+        ) from None
 
-    base_model = _saved["model"]
-    calibrator = _saved.get("calibrator", None)
+    quit_model = _saved["model"]  # calibrated wrapper when a calibrator was saved
     tuned_threshold = _saved["threshold"]
     saved_features = _saved["features"]
-    saved_encoders = _saved.get("label_encoders", {})
-
-    # Reconstruct calibrated wrapper (same as agent.py)
-    if calibrator is not None:
-
-        class _CalibratedModel:
-            def __init__(self, base, cal):
-                self.base_model = base
-                self.calibrator = cal
-
-            def predict_proba(self, X):
-                raw = self.base_model.predict_proba(X)[:, 1]
-                cal = self.calibrator.predict(raw)
-                return np.column_stack([1 - cal, cal])
-
-        quit_model = _CalibratedModel(base_model, calibrator)
-    else:
-        quit_model = base_model  # backwards-compatible
+    saved_encoders = _saved["label_encoders"]
 
     # ── Batch prediction (vectorized — replaces per-employee loop) ──
-    records = [
-        {
-            "job_satisfaction": emp.job_satisfaction,
-            "work_life_balance": emp.work_life_balance,
-            "environment_satisfaction": emp.environment_satisfaction,
-            "job_involvement": emp.job_involvement,
-            "monthly_income": emp.monthly_income,
-            "years_at_company": emp.years_at_company,
-            "total_working_years": emp.total_working_years,
-            "num_companies_worked": emp.num_companies_worked,
-            "job_level": emp.job_level,
-            "years_since_last_promotion": emp.years_since_last_promotion,
-            "years_with_curr_manager": emp.years_with_curr_manager,
-            "performance_rating": emp.performance_rating,
-            "stock_option_level": emp.stock_option_level,
-            "age": emp.age,
-            "distance_from_home": emp.distance_from_home,
-            "percent_salary_hike": emp.percent_salary_hike,
-            "years_in_current_role": getattr(emp, "years_in_current_role", 0) or 0,
-            "marital_status": emp.marital_status,
-            "overtime": getattr(emp, "overtime", 0) or 0,
-            # Needed so engineer_features can create department_encoded / job_role_encoded
-            "department": getattr(emp, "department", None),
-            "job_role": getattr(emp, "job_role", None),
-            "attrition": emp.attrition,
-        }
-        for emp in employees
-    ]
-
-    df_all = pd.DataFrame(records)
+    # Nullable columns the old per-row records coerced with `or 0`.
+    df_all[["years_in_current_role", "overtime"]] = df_all[
+        ["years_in_current_role", "overtime"]
+    ].fillna(0)
     df_all = engineer_features(df_all, encoders=saved_encoders)
 
     # Single batch call — massively faster than N individual predict_proba calls
-    quit_probs = quit_model.predict_proba(df_all[saved_features])[:, 1]
-    burnout_limits = np.array(
-        [burnout_threshold(emp.job_level, emp.total_working_years) for emp in employees]
-    )
-    labels = (df_all["attrition"] == "Yes").astype(int).values
-
-    attrition_counts = sum(1 for emp in employees if emp.attrition == "Yes")
-    total = len(employees)
+    # float32 block: XGBoost compares splits in float32 anyway, so predictions are
+    # identical while half the bytes flow through the predictor. The float64
+    # columns in df_all stay as-is for the aggregate statistics below. Passed as
+    # one ndarray, not a float32 DataFrame the model would convert again.
+    X = df_all[saved_features].to_numpy(dtype=np.float32)
+    quit_probs = quit_model.predict_proba(X)[:, 1]
+    burnout_limits = burnout_thresholds(df_all["job_level"], df_all["total_working_years"])
+    # One boolean pass over the label column, reused for the count and both
+    # quitter / stayer slices below.
+    quit_mask = (df_all["attrition"] == "Yes").to_numpy()
+
+    attrition_counts = int(quit_mask.sum())
+    total = len(df_all)
     annual_attrition_rate = attrition_counts / total if attrition_counts > 0 else 0.15
 
-    monthly_natural_rate = 1 - (1 - annual_attrition_rate) ** (1 / 12)
-    monthly_probs = 1 - (1 - quit_probs) ** (1 / 12)
+    monthly_natural_rate = _to_monthly(annual_attrition_rate)
+    monthly_probs = _to_monthly(quit_probs)
 
     # New hire probability — model score for a fresh hire (years_at_company=0).
     # Use 10th percentile of short-tenure employees (<=1yr) instead of mean.
     # The mean is ~29% because the cohort is dominated by genuinely unhappy employees
     # the model correctly flags as at-risk. The 10th percentile represents the
     # lowest-risk new hires — a realistic cap for replacement employees.
-    short_tenure_mask = np.array([emp.years_at_company <= 1 for emp in employees])
+    years_at_company = df_all["years_at_company"].to_numpy(dtype=np.float64)
+    short_tenure_mask = years_at_company <= 1
     if short_tenure_mask.sum() >= 10:
         new_hire_monthly_prob = float(np.percentile(monthly_probs[short_tenure_mask], 10))
     else:
@@ -123,14 +117,16 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
     # No mini-sim, no heuristics — the real engine tells us what it needs.
     prob_scale = 1.0
 
-    quitter_probs = quit_probs[labels == 1]
-    stayer_probs = quit_probs[labels == 0]
+    quitter_probs = quit_probs[quit_mask]
+    stayer_probs = quit_probs[~quit_mask]
     mean_quitter = float(np.mean(quitter_probs)) if len(quitter_probs) > 0 else 0.5
     mean_stayer = float(np.mean(stayer_probs)) if len(stayer_probs) > 0 else 0.2
 
-    # Convert to monthly before computing ratio — avoids compounding mismatch
-    mean_quitter_monthly = 1 - (1 - mean_quitter) ** (1 / 12)
-    mean_stayer_monthly = 1 - (1 - mean_stayer) ** (1 / 12)
+    # Convert to monthly before computing ratio — avoids compounding mismatch.
+    # Converts the group means, not a mean of monthly_probs: averaging after the
+    # concave transform would give a different (smaller) ratio.
+    mean_quitter_monthly = _to_monthly(mean_quitter)
+    mean_stayer_monthly = _to_monthly(mean_stayer)
     if mean_stayer_monthly > 0:
         raw_stress_amp = mean_quitter_monthly / mean_stayer_monthly
         # Cap at 5.0 — beyond this the simulation becomes unrealistically volatile.
@@ -143,8 +139,10 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
     if stress_amplification_override is not None:
         stress_amplification = float(stress_amplification_override)
 
-    avg_job_satisfaction = np.mean([emp.job_satisfaction for emp in employees])
-    avg_work_life_balance = np.mean([emp.work_life_balance for emp in employees])
+    # Both org-wide averages in one columnar reduction.
+    org_means = df_all[["job_satisfaction", "work_life_balance"]].mean()
+    avg_job_satisfaction = org_means["job_satisfaction"]
+    avg_work_life_balance = org_means["work_life_balance"]
 
     # ── Data-driven stress physics ──
     # stress_gain and recovery derived from stress_amplification + observed natural quit rate.
@@ -161,7 +159,7 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
     stress_gain_rate = round(float(min(max(stress_gain_rate, 0.0), 0.05)), 4)
     recovery_rate = round(float(min(max(recovery_rate, 0.0), 0.05)), 4)
 
-    avg_loyalty = np.mean([min(emp.years_at_company / 10.0, 1.0) for emp in employees])
+    avg_loyalty = np.minimum(years_at_company / 10.0, 1.0).mean()
     shockwave_stress_factor = round(0.3 * (1 - avg_loyalty * 0.3), 4)
     shockwave_loyalty_factor = round(0.1 * (1 - avg_loyalty * 0.2), 4)
 
@@ -179,15 +177,11 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
     # (stress_gain_rate * baseline_policy_stress_gain_rate) - recovery_rate per month
     #
     # baseline_policy_stress_gain_rate is read from POLICIES["baseline"] — single source of truth.
-    initial_stresses = np.array(
-        [
-            min(
-                max(0.0, (4.0 - emp.job_satisfaction) / 3.0) * 0.06
-                + min(emp.years_at_company / 10.0, 1.0) * 0.035,
-                0.40,
-            )
-            for emp in employees
-        ]
+    job_satisfaction = df_all["job_satisfaction"].to_numpy(dtype=np.float64)
+    initial_stresses = np.minimum(
+        np.maximum(0.0, (4.0 - job_satisfaction) / 3.0) * 0.06
+        + np.minimum(years_at_company / 10.0, 1.0) * 0.035,
+        0.40,
     )
 
     # Safety margin: how far above baseline peak before amplifier fires.
@@ -198,8 +192,10 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
     # make the amplifier meaningless even under extreme pressure).
     avg_burnout = float(np.mean(burnout_limits))
     percentile = max(50, min(80, round(90 - (stress_amplification * 7))))
-    stress_threshold = round(float(np.percentile(initial_stresses, percentile)), 4)
-    motivation_threshold = round(float(np.percentile(initial_stresses, 85)), 4)
+    # Both cut points from one selection pass over the stress distribution.
+    stress_cut, motivation_cut = np.percentile(initial_stresses, [percentile, 85])
+    stress_threshold = round(float(stress_cut), 4)
+    motivation_threshold = round(float(motivation_cut), 4)
 
     print(
         f"  >> stress_threshold={stress_threshold:.4f} "
@@ -301,7 +297,7 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
     # Lean baseline config: no shocks, moderate stress — pure quit-probability measurement
     calib_config = SimulationConfig(shock_factor=0.0, stress_gain_rate=0.75, duration_months=12)
 
-    # Load agents once, and build graph once. Deepcopy per run.
+    # Load agents once, and build graph once. Copy both per run.
     calib_agents_base = load_agents_from_db(session_id=session_id)
     calib_G_base = build_org_graph(calib_agents_base)
 
@@ -310,12 +306,7 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
         Returns the period attrition rate (fraction, not %).
         """
         agents_copy = copy.deepcopy(calib_agents_base)
-        G_copy = copy.deepcopy(calib_G_base)
-
-        id_to_copy = {a.employee_id: a for a in agents_copy}
-        for node_id in G_copy.nodes():
-            if node_id in id_to_copy:
-                G_copy.nodes[node_id]["agent"] = id_to_copy[node_id]
+        G_copy = calib_G_base.clone(agents_copy)
 
         result = run_simulation(
             calib_config,
@@ -325,6 +316,7 @@ def calibrate(stress_amplification_override=None, session_id: str = "global"):
             seed=seed,
             prob_scale_override=ps,
             session_id=session_id,
+            verbose=False,
         )
         return result["summary"].get("period_attrition_pct", 0.0) / 100.0
 
@@ -1,5 +1,7 @@
 # backend/ml/productivity_model.py
 
+import numpy as np
+
 
 def productivity_decay(
     stress: float,
@@ -37,3 +39,29 @@ def productivity_decay(
 
     # Allow temporary spikes up to 1.5x, floor at 0.1x
     return max(0.1, min(1.5, score))
+
+
+def productivity_decay_vec(
+    stress,
+    fatigue,
+    job_satisfaction,
+    work_life_balance,
+    workload_multiplier: float = 1.0,
+):
+    """
+    Array version of productivity_decay: one score per employee, same maths.
+    Used by the simulation tick to score the whole workforce in a few NumPy
+    passes instead of one Python call per agent.
+    """
+    base_score = 1.0 - stress * 0.30
+    base_score = base_score + (job_satisfaction - 3) * 0.10
+    base_score = base_score + (work_life_balance - 3) * 0.05
+
+    if workload_multiplier > 1.0:
+        crunch_boost = (workload_multiplier - 1.0) * 0.3
+        fatigue_penalty = fatigue * (workload_multiplier * 1.5)
+        score = base_score + crunch_boost - fatigue_penalty
+    else:
+        score = base_score - (fatigue * 0.20)
+
+    return np.clip(score, 0.1, 1.5)
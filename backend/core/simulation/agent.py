@@ -3,10 +3,46 @@
 
 import pandas as pd
 
-from backend.core.ml.attrition_model import engineer_features
+from backend.core.ml.attrition_model import engineer_features, load_quit_model_artifact
 from backend.core.ml.burnout_estimator import burnout_threshold as burnout_fn
 from backend.core.ml.productivity_decay import productivity_decay
 
+# Raw model-input columns, in get_raw_quit_dict order. Each is also the
+# EmployeeAgent attribute holding that value.
+RAW_QUIT_COLUMNS = (
+    "job_satisfaction",
+    "work_life_balance",
+    "environment_satisfaction",
+    "job_involvement",
+    "monthly_income",
+    "years_at_company",
+    "total_working_years",
+    "num_companies_worked",
+    "job_level",
+    "years_since_last_promotion",
+    "years_with_curr_manager",
+    "performance_rating",
+    "stock_option_level",
+    "age",
+    "distance_from_home",
+    "percent_salary_hike",
+    "years_in_current_role",
+    "overtime",
+    "department",
+    "job_role",
+)
+
+
+def raw_quit_frame(agents) -> pd.DataFrame:
+    """
+    Raw quit-model inputs for many agents as one DataFrame, built column by
+    column. Same frame as pd.DataFrame([a.get_raw_quit_dict() for a in agents])
+    without a dict per agent or pandas' per-record inference — this runs for
+    every candidate, every simulated month.
+    """
+    return pd.DataFrame({col: [getattr(a, col) for a in agents] for col in RAW_QUIT_COLUMNS})
+
+
 # Lazy-loaded — model is loaded on first use, not at import time.
 # This allows the server to start even if no model has been trained yet.
 _quit_model_cache = {}
@@ -16,9 +52,7 @@ def _get_quit_model(session_id: str = "global"):
     """Load (and cache) the quit model on first call."""
     global _quit_model_cache
     if session_id not in _quit_model_cache:
-        from backend.storage.storage import load_artifact
-
-        _saved = load_artifact("quit_model", session_id=session_id)
+        _saved = load_quit_model_artifact(session_id=session_id)
         if not _saved:
             raise FileNotFoundError(
                 "Quit model not found in DB. "
@@ -84,6 +118,58 @@ def clear_quit_model_cache(session_id: str = None):
 
 
 class EmployeeAgent:
+    # Plain in-memory record, decoupled from the Employee SQLModel once loaded.
+    # Fixed slots instead of a per-instance __dict__: Monte Carlo deep-copies
+    # every agent once per run, and the behaviour engine reads these attributes
+    # for every agent every month.
+    __slots__ = (
+        "employee_id",
+        "department",
+        "job_role",
+        "job_level",
+        "manager_id",
+        "years_at_company",
+        "total_working_years",
+        "num_companies_worked",
+        "monthly_income",
+        "job_satisfaction",
+        "work_life_balance",
+        "environment_satisfaction",
+        "job_involvement",
+        "performance_rating",
+        "years_since_last_promotion",
+        "years_with_curr_manager",
+        "stock_option_level",
+        "age",
+        "distance_from_home",
+        "percent_salary_hike",
+        "marital_status",
+        "years_in_current_role",
+        "overtime",
+        # Simulation state
+        "baseline_satisfaction",
+        "baseline_wlb",
+        "stress",
+        "fatigue",
+        "motivation",
+        "loyalty",
+        "is_active",
+        "productivity",
+        "burnout_limit",
+    )
+
+    def __deepcopy__(self, memo):
+        # Every slot holds an immutable scalar, so a field-by-field copy is a
+        # full deep copy — without deepcopy's generic per-attribute recursion.
+        clone = object.__new__(type(self))
+        for name in EmployeeAgent.__slots__:
+            try:
+                setattr(clone, name, getattr(self, name))
+            except AttributeError:  # slot never set (e.g. marital_status on new hires)
+                pass
+        memo[id(self)] = clone
+        return clone
+
     def __init__(self, db_employee):
         self.employee_id = db_employee.employee_id
         self.department = db_employee.department
@@ -134,7 +220,7 @@ class EmployeeAgent:
         self.burnout_limit = burnout_fn(db_employee.job_level, db_employee.total_working_years)
 
     def get_raw_quit_dict(self):
-        """Build raw feature dict matching dataset columns."""
+        """Build raw feature dict matching dataset columns (see RAW_QUIT_COLUMNS)."""
         return {
             "job_satisfaction": self.job_satisfaction,
             "work_life_balance": self.work_life_balance,
@@ -1,7 +1,11 @@
 # backend/simulation/behavior_engine.py
 
 import math
+from typing import NamedTuple
 
+import numpy as np
+
+from backend.core.ml.productivity_decay import productivity_decay_vec
 from backend.core.simulation.agent import EmployeeAgent
 from backend.core.simulation.org_graph import OrgGraph
 
@@ -44,11 +48,13 @@ def _load_calibration(session_id: str = "global"):
 
 def clear_calibration_cache(session_id: str = None):
     """Invalidate the lazy cache so the next simulation re-reads calibration.json."""
-    global _calibration_cache
+    global _calibration_cache, _behavior_constants_cache
     if session_id is None:
         _calibration_cache = {}
+        _behavior_constants_cache = {}
     else:
         _calibration_cache.pop(session_id, None)
+        _behavior_constants_cache.pop(session_id, None)
 
 
 # All constants resolved lazily via _load_calibration() on first call
@@ -56,6 +62,63 @@ def _c(key, default, session_id: str = "global"):
     return _load_calibration(session_id=session_id).get(key, default)
 
 
+class _BehaviorConstants(NamedTuple):
+    """update_agent_state's calibration constants, in its unpacking order."""
+
+    stress_gain_rate: float
+    recovery_rate: float
+    neighbor_stress_weight: float
+    fatigue_stress_weight: float
+    comm_quality_cap: float
+    comm_quality_benefit: float
+    fatigue_gain_rate: float
+    fatigue_recovery_rate: float
+    fatigue_stress_trigger: float
+    motivation_recovery_rate: float
+    motivation_threshold: float
+    wlb_stress_buffer: float
+    wlb_stress_sensitivity: float
+    wlb_drop_rate: float
+    wlb_recovery_rate: float
+    burnout_productivity_penalty: float
+
+
+_behavior_constants_cache: dict[str, _BehaviorConstants] = {}
+
+
+def _behavior_constants(session_id: str = "global") -> _BehaviorConstants:
+    """
+    Calibration constants for update_agent_state, resolved once per session.
+    update_agent_state runs for every agent every month; resolving its 16
+    constants through _c() there cost 16 calls and ~30 dict lookups per agent.
+    Cleared together with the calibration it is derived from.
+    """
+    constants = _behavior_constants_cache.get(session_id)
+    if constants is None:
+        constants = _BehaviorConstants(
+            stress_gain_rate=_c(
+                "behavior_stress_gain_rate", _c("stress_gain_rate", 0.0132, session_id), session_id
+            ),
+            recovery_rate=_c("recovery_rate", 0.0104, session_id),
+            neighbor_stress_weight=_c("neighbor_stress_weight", 0.01, session_id),
+            fatigue_stress_weight=_c("fatigue_stress_weight", 0.005, session_id),
+            comm_quality_cap=_c("comm_quality_cap", 5.0, session_id),
+            comm_quality_benefit=_c("comm_quality_benefit", 0.001, session_id),
+            fatigue_gain_rate=_c("fatigue_gain_rate", 0.03, session_id),
+            fatigue_recovery_rate=_c("fatigue_recovery_rate", 0.01, session_id),
+            fatigue_stress_trigger=_c("fatigue_stress_trigger", 0.5, session_id),
+            motivation_recovery_rate=_c("motivation_recovery_rate", 0.01, session_id),
+            motivation_threshold=_c("motivation_threshold", 0.15, session_id),
+            wlb_stress_buffer=_c("wlb_stress_buffer", 0.2, session_id),
+            wlb_stress_sensitivity=_c("wlb_stress_sensitivity", 1.5, session_id),
+            wlb_drop_rate=_c("wlb_drop_rate", 0.15, session_id),
+            wlb_recovery_rate=_c("wlb_recovery_rate", 0.1, session_id),
+            burnout_productivity_penalty=_c("burnout_productivity_penalty", 0.97, session_id),
+        )
+        _behavior_constants_cache[session_id] = constants
+    return constants
+
+
 def compute_neighbor_influence(agent: EmployeeAgent, G: OrgGraph) -> tuple[float, float]:
     """
     Read stress from neighbors weighted by edge weight.
@@ -64,10 +127,10 @@ def compute_neighbor_influence(agent: EmployeeAgent, G: OrgGraph) -> tuple[float
     neighbor_stress = 0.0
     comm_quality = 0.0
 
-    for neighbor_id in G.neighbors(agent.employee_id):
-        edge_data = G[agent.employee_id][neighbor_id]
-        weight = edge_data.get("weight", 0.5)
-        neighbor_agent = G.nodes[neighbor_id].get("agent")
+    # Cached (weight, node attributes) per neighbour, in G.neighbors() order —
+    # no adjacency views or node lookups per edge on this every-agent path.
+    for weight, node_attrs in G.neighbor_links(agent.employee_id):
+        neighbor_agent = node_attrs.get("agent")
 
         if neighbor_agent and neighbor_agent.is_active:
             neighbor_stress += weight * neighbor_agent.stress
@@ -85,33 +148,36 @@ def update_agent_state(
     bonus: float = 0.0,
     wlb_boost: float = 0.0,
     session_id: str = "global",
+    update_productivity: bool = True,
 ):
     """
     Update one agent's behavioral state for one timestep.
     All constants from calibration.json via lazy loader — picks up retrain without restart.
+    update_productivity=False skips the productivity step, for callers that
+    score the whole workforce afterwards with update_productivity_batch.
     """
     if not agent.is_active:
         return
 
-    # Resolve constants lazily each call (cached after first load)
-    STRESS_GAIN_RATE = _c(
-        "behavior_stress_gain_rate", _c("stress_gain_rate", 0.0132, session_id), session_id
-    )
-    RECOVERY_RATE = _c("recovery_rate", 0.0104, session_id)
-    NEIGHBOR_STRESS_WEIGHT = _c("neighbor_stress_weight", 0.01, session_id)
-    FATIGUE_STRESS_WEIGHT = _c("fatigue_stress_weight", 0.005, session_id)
-    COMM_QUALITY_CAP = _c("comm_quality_cap", 5.0, session_id)
-    COMM_QUALITY_BENEFIT = _c("comm_quality_benefit", 0.001, session_id)
-    FATIGUE_GAIN_RATE = _c("fatigue_gain_rate", 0.03, session_id)
-    FATIGUE_RECOVERY_RATE = _c("fatigue_recovery_rate", 0.01, session_id)
-    FATIGUE_STRESS_TRIGGER = _c("fatigue_stress_trigger", 0.5, session_id)
-    MOTIVATION_RECOVERY_RATE = _c("motivation_recovery_rate", 0.01, session_id)
-    MOTIVATION_THRESHOLD = _c("motivation_threshold", 0.15, session_id)
-    WLB_STRESS_BUFFER = _c("wlb_stress_buffer", 0.2, session_id)
-    WLB_STRESS_SENSITIVITY = _c("wlb_stress_sensitivity", 1.5, session_id)
-    WLB_DROP_RATE = _c("wlb_drop_rate", 0.15, session_id)
-    WLB_RECOVERY_RATE = _c("wlb_recovery_rate", 0.1, session_id)
-    BURNOUT_PROD_PENALTY = _c("burnout_productivity_penalty", 0.97, session_id)
+    # Resolved once per session (see _behavior_constants)
+    (
+        STRESS_GAIN_RATE,
+        RECOVERY_RATE,
+        NEIGHBOR_STRESS_WEIGHT,
+        FATIGUE_STRESS_WEIGHT,
+        COMM_QUALITY_CAP,
+        COMM_QUALITY_BENEFIT,
+        FATIGUE_GAIN_RATE,
+        FATIGUE_RECOVERY_RATE,
+        FATIGUE_STRESS_TRIGGER,
+        MOTIVATION_RECOVERY_RATE,
+        MOTIVATION_THRESHOLD,
+        WLB_STRESS_BUFFER,
+        WLB_STRESS_SENSITIVITY,
+        WLB_DROP_RATE,
+        WLB_RECOVERY_RATE,
+        BURNOUT_PROD_PENALTY,
+    ) = _behavior_constants(session_id)
 
     # Get neighbor influence
     neighbor_stress, comm_quality = compute_neighbor_influence(agent, G)
@@ -144,27 +210,44 @@ def update_agent_state(
     else:
         overtime_stress_relief = 0.0
     stress_gain = raw_stress_gain - overtime_stress_relief
-    agent.stress = max(0.0, min(agent.stress + stress_gain - RECOVERY_RATE, 1.0))
+    # The stress/fatigue/motivation clamps below are conditional expressions
+    # rather than min()/max() calls — this runs for every agent every month and
+    # the builtin calls cost more than the comparisons. Each one returns exactly
+    # what the min()/max() it replaces would, ties and NaN included.
+    stress = agent.stress + stress_gain - RECOVERY_RATE
+    stress = 1.0 if 1.0 < stress else stress  # min(stress, 1.0)
+    stress = stress if stress > 0.0 else 0.0  # max(0.0, stress)
+    agent.stress = stress
 
     # Fatigue
-    if agent.stress > FATIGUE_STRESS_TRIGGER:
-        agent.fatigue = min(agent.fatigue + FATIGUE_GAIN_RATE, 1.0)
+    if stress > FATIGUE_STRESS_TRIGGER:
+        fatigue = agent.fatigue + FATIGUE_GAIN_RATE
+        fatigue = 1.0 if 1.0 < fatigue else fatigue  # min(fatigue, 1.0)
     else:
-        agent.fatigue = max(agent.fatigue - FATIGUE_RECOVERY_RATE, 0.0)
+        fatigue = agent.fatigue - FATIGUE_RECOVERY_RATE
+        fatigue = 0.0 if 0.0 > fatigue else fatigue  # max(fatigue, 0.0)
+    agent.fatigue = fatigue
 
     # Motivation decays under stress OR high workload.
     # Exception: when bonus > 0, pay compensates for workload — no workload decay
     # until stress crosses threshold (fatigue eventually overwhelms the pay benefit).
-    if agent.stress > MOTIVATION_THRESHOLD:
-        agent.motivation = max(agent.motivation - motivation_decay_rate, 0.0)
+    if stress > MOTIVATION_THRESHOLD:
+        motivation = agent.motivation - motivation_decay_rate
+        motivation = 0.0 if 0.0 > motivation else motivation
     elif workload_multiplier > 1.0 and bonus == 0.0:
         # High workload without pay compensation grinds motivation down
         workload_decay = motivation_decay_rate * (workload_multiplier - 1.0) * 1.5
-        agent.motivation = max(agent.motivation - workload_decay, 0.0)
+        motivation = agent.motivation - workload_decay
+        motivation = 0.0 if 0.0 > motivation else motivation
     else:
-        agent.motivation = min(
-            agent.motivation + MOTIVATION_RECOVERY_RATE, agent.baseline_satisfaction / 4.0
-        )
+        motivation = agent.motivation + MOTIVATION_RECOVERY_RATE
+        ceiling = agent.baseline_satisfaction / 4.0
+        motivation = ceiling if ceiling < motivation else motivation
+    agent.motivation = motivation
+
+    # From here on the freshly updated stress/fatigue/motivation are read from
+    # the locals above rather than re-read off the agent, and the bonus terms'
+    # log1p(bonus) is taken once.
 
     # Financial compensation (overtime pay or salary raise) — phases out with fatigue.
     # Uses a log-scale lift so a large raise (bonus=2.5) is clearly better than a
@@ -174,19 +257,21 @@ def update_agent_state(
     #   bonus=2.5 → lift≈+0.73  (large boost from 25%+ raise — aggressive retention)
     effective_bonus = 0.0
     if bonus > 0.0:
-        fatigue_discount = max(0.0, 1.0 - agent.fatigue)
+        log_bonus = math.log1p(bonus)
+        fatigue_discount = max(0.0, 1.0 - fatigue)
 
         # Non-linear penalty: money loses its effectiveness if the employee is deeply burned out
         burnout_factor = 1.0
-        if agent.stress > agent.burnout_limit:
-            overshoot = (agent.stress - agent.burnout_limit) / max(1.0 - agent.burnout_limit, 0.01)
+        burnout_limit = agent.burnout_limit
+        if stress > burnout_limit:
+            overshoot = (stress - burnout_limit) / max(1.0 - burnout_limit, 0.01)
             # Quadratic decay. If overshoot is 0.5 (halfway to guaranteed break), bonus loses 25% power.
             # If overshoot is >0.95 (fully past limit), bonus loses almost all power.
             burnout_factor = max(0.1, 1.0 - (overshoot**2))
 
-        effective_bonus = math.log1p(bonus) * fatigue_discount * burnout_factor
+        effective_bonus = log_bonus * fatigue_discount * burnout_factor
 
-    base_satisfaction = (agent.motivation * 4.0) + effective_bonus
+    base_satisfaction = (motivation * 4.0) + effective_bonus
     agent.job_satisfaction = max(
         1.0, min(4.0, base_satisfaction)
     )  # capped at 4.0 to match training range
@@ -194,14 +279,14 @@ def update_agent_state(
     # Financial loyalty gain — proportional to raise magnitude.
     # A 25% raise (bonus=2.5) builds loyalty significantly faster than a 5% raise (bonus=0.5).
     if bonus > 0.0:
-        loyalty_gain = math.log1p(bonus) * 0.008 * (1.0 - agent.fatigue)
+        loyalty_gain = log_bonus * 0.008 * (1.0 - fatigue)
         agent.loyalty = min(1.0, agent.loyalty + loyalty_gain)
 
     # WLB drifts toward a target based on stress above the buffer.
     # wlb_boost raises the target ceiling — used by flexible/remote policies
     # to reflect that autonomy and schedule control genuinely improve WLB
     # beyond what stress reduction alone achieves.
-    perceptible_stress = max(0.0, agent.stress - WLB_STRESS_BUFFER)
+    perceptible_stress = max(0.0, stress - WLB_STRESS_BUFFER)
     target_wlb = max(
         1.0,
         min(4.0, agent.baseline_wlb + wlb_boost - (perceptible_stress * WLB_STRESS_SENSITIVITY)),
@@ -211,6 +296,9 @@ def update_agent_state(
     else:
         agent.work_life_balance = min(target_wlb, agent.work_life_balance + WLB_RECOVERY_RATE)
 
+    if not update_productivity:
+        return
+
     # Productivity
     agent.update_productivity(workload_multiplier)
 
@@ -225,16 +313,53 @@ def update_agent_state(
         agent.productivity *= burnout_penalty
 
 
+def update_productivity_batch(
+    agents: list[EmployeeAgent], workload_multiplier: float, session_id: str = "global"
+):
+    """
+    Productivity step of update_agent_state for many agents at once: decay
+    plus the graduated burnout penalty, computed over arrays. Nothing else in
+    the tick reads productivity, so running it after the per-agent loop gives
+    the same values.
+    """
+    if not agents:
+        return
+
+    BURNOUT_PROD_PENALTY = _behavior_constants(session_id).burnout_productivity_penalty
+
+    def column(attr):
+        return np.fromiter((getattr(a, attr) for a in agents), dtype=np.float64, count=len(agents))
+
+    stress = column("stress")
+    burnout_limit = column("burnout_limit")
+    productivity = productivity_decay_vec(
+        stress,
+        column("fatigue"),
+        column("job_satisfaction"),
+        column("work_life_balance"),
+        workload_multiplier,
+    )
+
+    overshoot = (stress - burnout_limit) / np.maximum(1.0 - burnout_limit, 0.01)
+    productivity = np.where(
+        stress > burnout_limit,
+        productivity * BURNOUT_PROD_PENALTY ** (1.0 + overshoot),
+        productivity,
+    )
+
+    for agent, value in zip(agents, productivity.tolist()):
+        agent.productivity = value
+
+
 def apply_attrition_shockwave(
     quitting_agent: EmployeeAgent, G: OrgGraph, shock_factor: float, session_id: str = "global"
 ):
     """When an agent quits, their neighbors feel the impact."""
     shockwave_stress = _c("shockwave_stress_factor", 0.3, session_id)
     shockwave_loyalty = _c("shockwave_loyalty_factor", 0.1, session_id)
-    for neighbor_id in list(G.neighbors(quitting_agent.employee_id)):
-        edge_data = G[quitting_agent.employee_id][neighbor_id]
-        weight = edge_data.get("weight", 0.5)
-        neighbor_agent = G.nodes[neighbor_id].get("agent")
+    # Same cached (weight, node attributes) links the monthly update reads.
+    for weight, node_attrs in G.neighbor_links(quitting_agent.employee_id):
+        neighbor_agent = node_attrs.get("agent")
 
         if neighbor_agent and neighbor_agent.is_active:
             # Cascade velocity cap: max stress added per quit event = 0.05.
@@ -6,7 +6,21 @@ import numpy as np
 
 from backend.core.simulation.org_graph import build_org_graph
 from backend.core.simulation.policies import SimulationConfig
-from backend.core.simulation.time_engine import load_agents_from_db, run_simulation
+from backend.core.simulation.time_engine import load_base_agents, run_simulation
+
+# Per-month metrics reported by run_simulation, in result order.
+_AGGREGATED_METRICS = (
+    "headcount",
+    "attrition_count",
+    "layoff_count",
+    "avg_stress",
+    "avg_productivity",
+    "avg_motivation",
+    "burnout_count",
+    "avg_job_satisfaction",
+    "avg_work_life_balance",
+    "avg_loyalty",
+)
 
 
 def run_monte_carlo(
@@ -22,74 +36,80 @@ def run_monte_carlo(
     """
     print(f"=== Running Monte Carlo: {runs} simulations - Policy: {policy_name.upper()}")
 
-    # Load once — used as the immutable base for ALL runs
-    base_agents = load_agents_from_db(session_id=session_id)
+    # Load once — used as the immutable base for ALL runs. Cached per dataset
+    # version, so repeat jobs on the same upload skip the employee SELECT.
+    base_agents, dataset_version = load_base_agents(session_id=session_id)
 
-    # Build org graph ONCE from base agents, then deepcopy it per run.
+    # Build org graph ONCE from base agents, then clone it per run.
     # Previously deepcopy(base_agents) produced new object ids, breaking the
     # _cached_template_graph key, so build_org_graph rebuilt 69k edges on
     # every single run. Building once and copying the graph object is ~50x faster.
-    base_G = build_org_graph(base_agents)
+    # Keyed by session + dataset version so two sessions with the same headcount
+    # never share a template.
+    base_G = build_org_graph(
+        base_agents,
+        dataset_id=f"{session_id}:{dataset_version}" if dataset_version else None,
+    )
 
     all_logs = []
     all_summaries = []
 
+    # Independent per-run streams. The old seed + i scheme overlapped across
+    # jobs (seed=42's run 2 was seed=43's run 1), so two "different" seeds shared
+    # most of their runs. SeedSequence.spawn gives statistically independent
+    # children and stays reproducible for a given seed.
+    run_seeds = np.random.SeedSequence(seed).spawn(runs)
+
+    # Progress roughly every 5% of runs; the runs themselves stay quiet.
+    progress_every = max(1, runs // 20)
     for i in range(runs):
-        print(f"   Run {i+1}/{runs}...", end="\r")
+        if (i + 1) % progress_every == 0 or i + 1 == runs:
+            print(f"   Run {i + 1}/{runs}...", end="\r")
         agents_copy = copy.deepcopy(base_agents)
-        G_copy = copy.deepcopy(base_G)
-
-        # Re-wire graph node agent references to the copied agents so the
-        # behavior engine reads the copied state, not the base state.
-        id_to_copy = {a.employee_id: a for a in agents_copy}
-        for node_id in G_copy.nodes():
-            if node_id in id_to_copy:
-                G_copy.nodes[node_id]["agent"] = id_to_copy[node_id]
+        # Graph nodes point at the copied agents so the behavior engine reads
+        # the copied state, not the base state.
+        G_copy = base_G.clone(agents_copy)
 
         result = run_simulation(
             config,
             agents=agents_copy,
             G=G_copy,
             policy_name=policy_name,
-            seed=seed + i,
+            seed=run_seeds[i],
             session_id=session_id,
+            verbose=False,
         )
         all_logs.append(result["logs"])
         all_summaries.append(result.get("summary", {}))
 
     print("\n[done] Monte Carlo complete.")
 
-    # Aggregate across runs for each month
+    # Aggregate across runs for each month.
+    # Stack every run's monthly metrics into one (runs, months, metrics) array and
+    # reduce along the runs axis — one NumPy call per statistic instead of four
+    # per metric per month.
     duration = len(all_logs[0]) if all_logs else 0
     aggregated = []
 
-    for month_idx in range(duration):
-        month_data = [run[month_idx] for run in all_logs]
-
-        def stat(key):
-            values = [m[key] for m in month_data]
-            return {
-                "mean": round(float(np.mean(values)), 4),
-                "min": round(float(np.min(values)), 4),
-                "max": round(float(np.max(values)), 4),
-                "std": round(float(np.std(values)), 4),
-            }
-
-        aggregated.append(
-            {
-                "month": month_idx + 1,
-                "headcount": stat("headcount"),
-                "attrition_count": stat("attrition_count"),
-                "layoff_count": stat("layoff_count"),
-                "avg_stress": stat("avg_stress"),
-                "avg_productivity": stat("avg_productivity"),
-                "avg_motivation": stat("avg_motivation"),
-                "burnout_count": stat("burnout_count"),
-                "avg_job_satisfaction": stat("avg_job_satisfaction"),
-                "avg_work_life_balance": stat("avg_work_life_balance"),
-                "avg_loyalty": stat("avg_loyalty"),
-            }
+    if duration:
+        samples = np.array(
+            [[[m[key] for key in _AGGREGATED_METRICS] for m in run[:duration]] for run in all_logs],
+            dtype=np.float64,
         )
+        stats = {
+            "mean": np.round(samples.mean(axis=0), 4),
+            "min": np.round(samples.min(axis=0), 4),
+            "max": np.round(samples.max(axis=0), 4),
+            "std": np.round(samples.std(axis=0), 4),
+        }
+
+        for month_idx in range(duration):
+            month_entry = {"month": month_idx + 1}
+            for k, key in enumerate(_AGGREGATED_METRICS):
+                month_entry[key] = {
+                    name: float(values[month_idx, k]) for name, values in stats.items()
+                }
+            aggregated.append(month_entry)
 
     # --- Executive / domain-level summary ---
     if aggregated:
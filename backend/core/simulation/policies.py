@@ -1,10 +1,12 @@
 # backend/simulation/policies.py
 
-import copy
 from dataclasses import dataclass
+from functools import lru_cache
 
 
-@dataclass
+# frozen: built-in configs are cached and shared across requests, so derive
+# variants with dataclasses.replace() instead of mutating them in place.
+@dataclass(frozen=True)
 class SimulationConfig:
     workload_multiplier: float = 1.0
     motivation_decay_rate: float = 0.005
@@ -81,6 +83,9 @@ POLICIES = {
     ),
 }
 
+# Membership checks on every /run and /compare — built once at import.
+POLICY_NAMES = frozenset(POLICIES)
+
 
 def get_policy(policy_name: str, config_override: dict = None) -> SimulationConfig:
     """
@@ -101,8 +106,13 @@ def get_policy(policy_name: str, config_override: dict = None) -> SimulationConf
             "and pass the returned log_id as policy_log_id when running the simulation."
         )
 
-    if policy_name not in POLICIES:
+    return _builtin_policy(policy_name)
+
+
+@lru_cache(maxsize=len(POLICIES))
+def _builtin_policy(policy_name: str) -> SimulationConfig:
+    if policy_name not in POLICY_NAMES:
         raise ValueError(
             f"Unknown policy: {policy_name}. " f"Available: {list(POLICIES.keys())} or 'custom'"
         )
-    return copy.copy(POLICIES[policy_name])
+    return POLICIES[policy_name]
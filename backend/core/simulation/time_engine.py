@@ -4,7 +4,11 @@ import numpy as np
 from sqlmodel import Session, select
 
 from backend.core.simulation.agent import EmployeeAgent
-from backend.core.simulation.behavior_engine import apply_attrition_shockwave, update_agent_state
+from backend.core.simulation.behavior_engine import (
+    apply_attrition_shockwave,
+    update_agent_state,
+    update_productivity_batch,
+)
 from backend.core.simulation.org_graph import OrgGraph, build_org_graph
 from backend.core.simulation.policies import SimulationConfig, get_policy
 from backend.db.database import engine
@@ -46,38 +50,86 @@ def _get_calibration(session_id: str = "global"):
 
 
 def load_agents_from_db(session_id: str = "global") -> list[EmployeeAgent]:
-    with Session(engine) as session:
-        all_employees = session.exec(
-            select(Employee).where(Employee.session_id == session_id).order_by(Employee.employee_id)
-        ).all()
-
     # Load all employees regardless of Attrition label.
     # Attrition="Yes" is past information used to train the ML model.
     # The simulation asks: who will quit in the future?
     # The model answers that from features alone, not the historical label.
     # Hiring replacements happens during the simulation when someone actually quits.
-    agents = [EmployeeAgent(emp) for emp in all_employees]
+    # Rows are streamed in batches and turned into agents as they arrive, so the
+    # full list of Employee ORM objects never sits in memory next to the agents.
+    with Session(engine) as session:
+        rows = session.exec(
+            select(Employee)
+            .where(Employee.session_id == session_id, Employee.simulation_id == "master")
+            .order_by(Employee.employee_id)
+            .execution_options(yield_per=5_000)
+        )
+        agents = [EmployeeAgent(emp) for emp in rows]
     print(f"  >> Loaded {len(agents)} employees (Attrition label ignored)")
     return agents
 
 
+# Base agents per session, keyed by dataset version. Employee rows only change
+# on /upload/dataset, so Monte Carlo jobs reuse the loaded agents instead of
+# re-selecting and re-building every row on each /run.
+_base_agents_cache = {}
+
+
+def clear_base_agents_cache(session_id: str = None):
+    global _base_agents_cache
+    if session_id is None:
+        _base_agents_cache = {}
+    else:
+        _base_agents_cache.pop(session_id, None)
+
+
+def get_dataset_version(session_id: str = "global") -> str | None:
+    """uploaded_at of the session's current dataset, or None (e.g. CLI ingest)."""
+    from backend.storage.storage import load_artifact
+
+    metadata = load_artifact("dataset_metadata", session_id=session_id)
+    return metadata.get("uploaded_at") if metadata else None
+
+
+def load_base_agents(session_id: str = "global") -> tuple[list[EmployeeAgent], str | None]:
+    """
+    Cached load_agents_from_db for Monte Carlo. Returns (agents, dataset_version).
+    The returned agents are shared — callers must deepcopy before mutating.
+    Without a dataset version there is nothing to invalidate on, so no caching.
+    """
+    version = get_dataset_version(session_id)
+    cached = _base_agents_cache.get(session_id)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1], version
+
+    agents = load_agents_from_db(session_id=session_id)
+    if version is not None:
+        _base_agents_cache[session_id] = (version, agents)
+    return agents, version
+
+
 def run_simulation(
     config: SimulationConfig = None,
     agents=None,
     G: OrgGraph = None,
     policy_name: str = "custom",
-    seed: int = 42,
+    seed: int | np.random.SeedSequence = 42,
     prob_scale_override: float = None,
     stress_amplification_override: float = None,
     session_id: str = "global",
+    verbose: bool = True,
 ) -> dict:
     """
     Run one simulation pass.
 
+    seed: int or a SeedSequence child (Monte Carlo passes one spawned stream per run).
     prob_scale_override: override prob_scale from calibration.json (used by calibration loop).
     stress_amplification_override: override stress_amplification from calibration.json.
         Pass 0.0 during calibration runs so prob_scale is fitted independently of
         the amplifier — they are separate mechanisms and must not be co-calibrated.
+    verbose: print the per-month status lines and the closing summary. Monte Carlo
+        and calibration pass False — they run this dozens of times and report
+        their own progress.
     """
     if config is None:
         config = SimulationConfig()
@@ -105,7 +157,8 @@ def run_simulation(
 
     _new_hire_cap = cal.get("new_hire_monthly_prob", NATURAL_MONTHLY_RATE * 2.0)
 
-    print(f"=== Starting simulation - Policy: {policy_name.upper()}")
+    if verbose:
+        print(f"=== Starting simulation - Policy: {policy_name.upper()}")
     if agents is None:
         agents = load_agents_from_db(session_id=session_id)
     if G is None:
@@ -128,8 +181,12 @@ def run_simulation(
         }
 
     max_id = max(a.employee_id for a in agents)
-    initial_headcount = len([a for a in agents if a.is_active])
-    initial_avg_stress = float(np.mean([a.stress for a in agents if a.is_active]))
+    # Active workforce as an insertion-ordered set (dict keys), kept in step with
+    # departures and hires — same order as filtering `agents` on is_active, without
+    # rescanning every ex-employee several times a month.
+    active = {a: None for a in agents if a.is_active}
+    initial_headcount = len(active)
+    initial_avg_stress = float(np.mean([a.stress for a in active]))
     logs = []
 
     # ── Policy: Inject salary raise into ML quit model features ──────────────
@@ -147,91 +204,108 @@ def run_simulation(
     _policy_salary_pct = config.salary_increase_pct  # 0.0 if not a salary policy
     if _policy_salary_pct > 0.0:
         _clamped_pct = min(_policy_salary_pct, 100.0)
-        print(
-            f"[time_engine] Injecting salary hike: {_clamped_pct:.1f}% "
-            f"into {len([a for a in agents if a.is_active])} agent features."
-        )
-        for agent in agents:
-            if agent.is_active:
-                agent.percent_salary_hike = _clamped_pct
-                agent.monthly_income = agent.monthly_income * (1.0 + _clamped_pct / 100.0)
+        if verbose:
+            print(
+                f"[time_engine] Injecting salary hike: {_clamped_pct:.1f}% "
+                f"into {len(active)} agent features."
+            )
+        for agent in active:
+            agent.percent_salary_hike = _clamped_pct
+            agent.monthly_income = agent.monthly_income * (1.0 + _clamped_pct / 100.0)
 
     for month in range(1, config.duration_months + 1):
-        print(f"--- Month {month}...")
+        if verbose:
+            print(f"--- Month {month}...")
 
         # Update all agent states
-        for agent in agents:
-            if agent.is_active:
-                update_agent_state(
-                    agent,
-                    G,
-                    workload_multiplier=config.workload_multiplier,
-                    motivation_decay_rate=config.motivation_decay_rate,
-                    stress_gain_rate=config.stress_gain_rate,
-                    bonus=config.bonus,
-                    wlb_boost=config.wlb_boost,
-                    session_id=session_id,
-                )
+        active_agents = list(active)
+        for agent in active_agents:
+            update_agent_state(
+                agent,
+                G,
+                workload_multiplier=config.workload_multiplier,
+                motivation_decay_rate=config.motivation_decay_rate,
+                stress_gain_rate=config.stress_gain_rate,
+                bonus=config.bonus,
+                wlb_boost=config.wlb_boost,
+                session_id=session_id,
+                update_productivity=False,
+            )
+        # Productivity for the whole workforce in one vectorised pass.
+        update_productivity_batch(active_agents, config.workload_multiplier, session_id=session_id)
 
         # Layoffs
         layoff_agents = []
         if config.layoff_ratio > 0 and month == 1:
-            active = [a for a in agents if a.is_active]
-            n_layoffs = int(len(active) * config.layoff_ratio)
-            layoff_targets = sorted(active, key=lambda a: a.performance_rating)[:n_layoffs]
+            n_layoffs = int(len(active_agents) * config.layoff_ratio)
+            layoff_targets = sorted(active_agents, key=lambda a: a.performance_rating)[:n_layoffs]
             for agent in layoff_targets:
                 layoff_agents.append(agent)
 
         # Voluntary attrition
         quitting_agents = []
-        candidate_agents = [a for a in agents if a.is_active and a not in layoff_agents]
+        if layoff_agents:
+            laid_off = set(layoff_agents)
+            candidate_agents = [a for a in active_agents if a not in laid_off]
+        else:
+            candidate_agents = active_agents
 
         if candidate_agents:
-            import pandas as pd
-
             from backend.core.ml.attrition_model import engineer_features
-            from backend.core.simulation.agent import _quit_encoders, _quit_features, _quit_model
+            from backend.core.simulation.agent import (
+                _quit_encoders,
+                _quit_features,
+                _quit_model,
+                raw_quit_frame,
+            )
 
             # Batch feature engineering & prediction (~50x speedup)
-            raw_data = [a.get_raw_quit_dict() for a in candidate_agents]
-            df = pd.DataFrame(raw_data)
+            df = raw_quit_frame(candidate_agents)
             df = engineer_features(df, encoders=_quit_encoders(session_id))
-            yearly_probs = _quit_model(session_id).predict_proba(df[_quit_features(session_id)])[
-                :, 1
-            ]
-
-            for i, agent in enumerate(candidate_agents):
-                yearly_prob = yearly_probs[i]
-                monthly_prob = 1 - (1 - yearly_prob) ** (1 / 12)
-
-                # Mid-simulation new hires (years_at_company=0) have zero-valued engineered
-                # features so the model over-scores them. Cap at new_hire_monthly_prob —
-                # derived from real short-tenure employees in calibration, same cap used
-                # in mini-sim so prob_scale stays consistent.
-                if agent.years_at_company == 0:
-                    monthly_prob = min(monthly_prob, _new_hire_cap)
-
-                # ── Survival discount (fixes month-1 initialization spike) ──
-                # Existing employees have implicitly survived years_at_company * 12 monthly
-                # quit rolls that were never simulated. A 10-yr veteran's realized
-                # monthly probability should reflect that survival. New hires (years=0)
-                # get exp(0) = 1.0 (unaffected).
-                if agent.years_at_company > 0:
-                    survival_discount = np.exp(-monthly_prob * 12 * agent.years_at_company)
-                    monthly_prob *= survival_discount
-
-                excess_stress = max(0.0, agent.stress - STRESS_THRESHOLD)
-                stress_scale = 1.0 + _stress_amp * excess_stress  # uses override during calibration
-                effective_prob = min(1.0, monthly_prob * _prob_scale * stress_scale)
-
-                if rng.random() < effective_prob:
-                    quitting_agents.append(agent)
+            # float32 like training: same predictions, half the bytes per predict.
+            # Straight to one ndarray — no intermediate float32 DataFrame for the
+            # model to convert again (training was on arrays too).
+            X = df[_quit_features(session_id)].to_numpy(dtype=np.float32)
+            yearly_probs = _quit_model(session_id).predict_proba(X)[:, 1]
+
+            # Quit decision for all candidates at once. Same arithmetic as the old
+            # per-agent loop; rng.random(n) consumes the generator exactly like n
+            # scalar rng.random() calls, so seeded runs are unchanged.
+            tenure = np.array([a.years_at_company for a in candidate_agents], dtype=np.float64)
+            stress = np.array([a.stress for a in candidate_agents], dtype=np.float64)
+
+            monthly_prob = 1 - (1 - yearly_probs) ** (1 / 12)
+
+            # Mid-simulation new hires (years_at_company=0) have zero-valued engineered
+            # features so the model over-scores them. Cap at new_hire_monthly_prob —
+            # derived from real short-tenure employees in calibration, same cap used
+            # in mini-sim so prob_scale stays consistent.
+            monthly_prob = np.where(
+                tenure == 0, np.minimum(monthly_prob, _new_hire_cap), monthly_prob
+            )
+
+            # ── Survival discount (fixes month-1 initialization spike) ──
+            # Existing employees have implicitly survived years_at_company * 12 monthly
+            # quit rolls that were never simulated. A 10-yr veteran's realized
+            # monthly probability should reflect that survival. New hires (years=0)
+            # get exp(0) = 1.0 (unaffected).
+            monthly_prob = np.where(
+                tenure > 0, monthly_prob * np.exp(-monthly_prob * 12 * tenure), monthly_prob
+            )
+
+            excess_stress = np.maximum(0.0, stress - STRESS_THRESHOLD)
+            stress_scale = 1.0 + _stress_amp * excess_stress  # uses override during calibration
+            effective_prob = np.minimum(1.0, monthly_prob * _prob_scale * stress_scale)
+
+            quit_mask = rng.random(len(candidate_agents)) < effective_prob
+            quitting_agents = [a for a, quits in zip(candidate_agents, quit_mask) if quits]
 
         # Process departures
         departed_agents = list(dict.fromkeys(layoff_agents + quitting_agents))
         for agent in departed_agents:
             apply_attrition_shockwave(agent, G, config.shock_factor, session_id=session_id)
             agent.is_active = False
+            del active[agent]
             # G.remove_node() intentionally omitted: removing nodes permanently
             # breaks contagion paths. Inactive agents are skipped by behavior_engine.
 
@@ -244,9 +318,8 @@ def run_simulation(
 
             # Gather department-level satisfaction stats for realistic new hire init
             dept_agents: dict[str, list[EmployeeAgent]] = {}
-            for a in agents:
-                if a.is_active:
-                    dept_agents.setdefault(a.department, []).append(a)
+            for a in active:
+                dept_agents.setdefault(a.department, []).append(a)
 
             for quitter in list(quitting_agents):
                 if rng.random() < fill_prob:
@@ -259,7 +332,9 @@ def run_simulation(
                     # distribution ensures replacements inherit the current climate.
                     dept_peers = dept_agents.get(quitter.department, [])
                     if dept_peers:
-                        peer = rng.choice(dept_peers)
+                        # Same draw as rng.choice(dept_peers), without converting
+                        # the whole department into an object array per hire.
+                        peer = dept_peers[rng.integers(len(dept_peers))]
                         new_agent.job_satisfaction = peer.job_satisfaction
                         new_agent.work_life_balance = peer.work_life_balance
                         new_agent.environment_satisfaction = peer.environment_satisfaction
@@ -280,6 +355,7 @@ def run_simulation(
                         )
 
                     agents.append(new_agent)
+                    active[new_agent] = None
                     G.add_node(new_agent.employee_id, agent=new_agent)
                     if new_agent.manager_id and G.has_node(new_agent.manager_id):
                         G.add_edge(
@@ -290,7 +366,7 @@ def run_simulation(
                         )
 
         # Metrics
-        active_agents = [a for a in agents if a.is_active]
+        active_agents = list(active)
         if active_agents:
             avg_stress = np.mean([a.stress for a in active_agents])
             avg_productivity = np.mean([a.productivity for a in active_agents])
@@ -324,17 +400,18 @@ def run_simulation(
             }
         )
 
-        print(
-            f"   HC: {len(active_agents)} |"
-            f" Quit: {len(quitting_agents)} |"
-            f" Layoff: {len(layoff_agents)} |"
-            f" Stress: {avg_stress:.3f} |"
-            f" Productivity: {avg_productivity:.3f} |"
-            f" JobSat: {avg_job_sat:.2f} |"
-            f" WLB: {avg_wlb:.2f} |"
-            f" Loyalty: {avg_loyalty:.2f} |"
-            f" Burnout: {burnout_count}"
-        )
+        if verbose:
+            print(
+                f"   HC: {len(active_agents)} |"
+                f" Quit: {len(quitting_agents)} |"
+                f" Layoff: {len(layoff_agents)} |"
+                f" Stress: {avg_stress:.3f} |"
+                f" Productivity: {avg_productivity:.3f} |"
+                f" JobSat: {avg_job_sat:.2f} |"
+                f" WLB: {avg_wlb:.2f} |"
+                f" Loyalty: {avg_loyalty:.2f} |"
+                f" Burnout: {burnout_count}"
+            )
 
     # Summary
     total_quits = sum(log["attrition_count"] for log in logs)
@@ -353,24 +430,25 @@ def run_simulation(
         (total_workforce_loss / initial_headcount * 100) if initial_headcount > 0 else 0.0
     )
 
-    print(f"\n{'='*50}")
-    print(f"=== Simulation Summary - {policy_name.upper()}")
-    print(f"{'='*50}")
-    print(f"   Duration          : {config.duration_months} months")
-    print(f"   Initial Headcount : {int(initial_headcount)}")
-    print(f"   Final Headcount   : {int(final_headcount)}")
-    print(f"   Total Quits       : {total_quits}")
-    print(f"   Total Layoffs     : {total_layoffs}")
-    print(
-        f"   Attrition Rate    : {period_attrition_pct:.1f}% "
-        f"(~{annual_attrition_pct:.1f}% annualised, voluntary only)"
-    )
-    print(f"   Workforce Loss    : {total_workforce_loss_pct:.1f}% " f"(voluntary + involuntary)")
-    print(f"   Final Avg Stress  : {logs[-1]['avg_stress']:.3f}")
-    print(f"   Final Productivity: {logs[-1]['avg_productivity']:.3f}")
-    print(f"   Final Burnout     : {logs[-1]['burnout_count']}")
-    print(f"{'='*50}")
-    print("+++ Simulation complete.")
+    if verbose:
+        print(f"\n{'='*50}")
+        print(f"=== Simulation Summary - {policy_name.upper()}")
+        print(f"{'='*50}")
+        print(f"   Duration          : {config.duration_months} months")
+        print(f"   Initial Headcount : {int(initial_headcount)}")
+        print(f"   Final Headcount   : {int(final_headcount)}")
+        print(f"   Total Quits       : {total_quits}")
+        print(f"   Total Layoffs     : {total_layoffs}")
+        print(
+            f"   Attrition Rate    : {period_attrition_pct:.1f}% "
+            f"(~{annual_attrition_pct:.1f}% annualised, voluntary only)"
+        )
+        print(f"   Workforce Loss    : {total_workforce_loss_pct:.1f}% " f"(voluntary + involuntary)")
+        print(f"   Final Avg Stress  : {logs[-1]['avg_stress']:.3f}")
+        print(f"   Final Productivity: {logs[-1]['avg_productivity']:.3f}")
+        print(f"   Final Burnout     : {logs[-1]['burnout_count']}")
+        print(f"{'='*50}")
+        print("+++ Simulation complete.")
 
     summary = {
         "policy_name": policy_name,
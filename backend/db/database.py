@@ -11,10 +11,27 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env file")
 
+_is_sqlite = "sqlite" in DATABASE_URL
+
+# Connection pool sizing for server databases. SQLAlchemy's default (5 + 10
+# overflow) is below FastAPI's 40-thread pool, so sync routes and background
+# tasks queue on connection checkout under burst traffic. pool_recycle drops
+# connections before managed Postgres idle timeouts silently kill them.
+_pool_kwargs = (
+    {}
+    if _is_sqlite
+    else {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+)
+
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    **_pool_kwargs,
 )
 
 
@@ -42,6 +59,9 @@ def _run_migrations():
         "ALTER TABLE orchestrate_job ADD COLUMN IF NOT EXISTS session_id VARCHAR DEFAULT 'global'",
         "ALTER TABLE policy_generation_log ADD COLUMN IF NOT EXISTS session_id VARCHAR DEFAULT 'global'",
         "ALTER TABLE ml_artifact ADD COLUMN IF NOT EXISTS session_id VARCHAR DEFAULT 'global'",
+        # 2026-10-14: index for the per-session master employee reads
+        "CREATE INDEX IF NOT EXISTS ix_employee_session_simulation "
+        "ON employee (session_id, simulation_id, employee_id)",
         # Drop old PK and add composite PK for ml_artifact
         """
         DO $$
@@ -3,6 +3,7 @@
 import uuid as _uuid
 from datetime import datetime, timezone
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -11,6 +12,13 @@ def get_utc_now():
 
 
 class Employee(SQLModel, table=True):
+    # Every ML / simulation read is "this session's master rows, by employee_id".
+    # The (employee_id, session_id) primary key can't serve that filter, so
+    # without this index each read scans the employees of every session.
+    __table_args__ = (
+        Index("ix_employee_session_simulation", "session_id", "simulation_id", "employee_id"),
+    )
+
     # Identity
     employee_id: int = Field(primary_key=True)
     department: str = Field(default="General")
@@ -3,10 +3,12 @@ from contextlib import asynccontextmanager
 import sentry_sdk
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from backend.api import llm_routes, ml_routes, sim_routes, upload_routes
 from backend.config import logger, settings
 from backend.db.database import init_db
+from backend.workers.pool import shutdown_executor
 
 # Initialize Sentry for crash reporting
 if settings.sentry_dsn_backend:
@@ -25,9 +27,21 @@ async def lifespan(app: FastAPI):
     init_db()
     logger.info("✅ Database Initialized")
     yield
+    shutdown_executor()
 
 
-app = FastAPI(title="SimuOrg API", version="1.0.0", lifespan=lifespan)
+# orjson does the final encode in C instead of the stdlib json encoder's
+# per-float Python loop. Plain return values still go through FastAPI's
+# jsonable_encoder first, which rejects NumPy numbers such as np.int64 or
+# np.float32 (np.float64 gets through only because it subclasses float). Only
+# handlers that return an ORJSONResponse themselves (e.g. /api/sim/status)
+# skip that walk and may hand over NumPy values directly.
+app = FastAPI(
+    title="SimuOrg API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
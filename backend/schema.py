@@ -6,11 +6,14 @@
 #   - Optional column defaults (fill missing columns with sensible values)
 #   - Schema report (tell CEO what was found vs missing)
 
+from types import MappingProxyType
+
+import numpy as np
 import pandas as pd
 
 # ── Hard required — upload fails without these ──
 # Reduced to exactly 14 strictly required columns based on feature importance.
-REQUIRED_COLUMNS = [
+REQUIRED_COLUMNS = (
     "EmployeeID",
     "ManagerID",
     "Department",
@@ -27,76 +30,100 @@ REQUIRED_COLUMNS = [
     "JobLevel",
     "MonthlyIncome",
     "Attrition",
-]
+)
 
 # ── Column name aliases ──
-# Maps any known variation → our canonical schema name.
-COLUMN_ALIASES = {
-    # EmployeeID
-    "EmployeeNumber": "EmployeeID",
-    "Employee ID": "EmployeeID",
-    "employee_id": "EmployeeID",
-    "EmpID": "EmployeeID",
-    # Department
-    "Dept": "Department",
-    # Job fields
-    "Job Role": "JobRole",
-    "Job_Role": "JobRole",
-    "Job Level": "JobLevel",
-    "Job_Level": "JobLevel",
-    # Income
-    "Monthly Income": "MonthlyIncome",
-    "Monthly_Income": "MonthlyIncome",
-    "Salary": "MonthlyIncome",
-    "monthly_salary": "MonthlyIncome",
-    # Tenure — 'Years at Company' and 'Company Tenure' both map here
-    "Years at Company": "YearsAtCompany",
-    "Years_at_Company": "YearsAtCompany",
-    "Company Tenure": "CompanyTenure",
-    "Tenure": "YearsAtCompany",
-    # Total experience
-    "Total Working Years": "TotalWorkingYears",
-    "Total_Working_Years": "TotalWorkingYears",
-    "TotalExperience": "TotalWorkingYears",
-    # Satisfaction
-    "Work-Life Balance": "WorkLifeBalance",
-    "Work Life Balance": "WorkLifeBalance",
-    "Job Satisfaction": "JobSatisfaction",
-    "Job_Satisfaction": "JobSatisfaction",
-    "Environment Satisfaction": "EnvironmentSatisfaction",
-    "Environment_Satisfaction": "EnvironmentSatisfaction",
-    # Other IBM HR fields
-    "Performance Rating": "PerformanceRating",
-    "Job Involvement": "JobInvolvement",
-    "Num Companies Worked": "NumCompaniesWorked",
-    "Number of Companies": "NumCompaniesWorked",
-    "Stock Option Level": "StockOptionLevel",
-    "Years Since Last Promotion": "YearsSinceLastPromotion",
-    "Years With Current Manager": "YearsWithCurrManager",
-    "Distance from Home": "DistanceFromHome",
-    "Distance From Home": "DistanceFromHome",
-    "Marital Status": "MaritalStatus",
-    "Percent Salary Hike": "PercentSalaryHike",
-    # OverTime
-    "Over Time": "OverTime",
-    "over_time": "OverTime",
-    "overtime": "OverTime",
-    "Overtime": "OverTime",
-    # ── New dataset specific aliases ──
-    "Number of Promotions": "NumberOfPromotions",
-    "Number of Dependents": "NumberOfDependents",
-    "Education Level": "EducationLevel",
-    "Company Size": "CompanySize",
-    "Remote Work": "RemoteWork",
-    "Leadership Opportunities": "LeadershipOpportunities",
-    "Innovation Opportunities": "InnovationOpportunities",
-    "Company Reputation": "CompanyReputation",
-    "Employee Recognition": "EmployeeRecognition",
-}
+# Maps any known variation → our canonical schema name. Read-only, like the
+# value sets below — shared by every upload, so nothing may mutate it.
+COLUMN_ALIASES = MappingProxyType(
+    {
+        # EmployeeID
+        "EmployeeNumber": "EmployeeID",
+        "Employee ID": "EmployeeID",
+        "employee_id": "EmployeeID",
+        "EmpID": "EmployeeID",
+        # Department
+        "Dept": "Department",
+        # Job fields
+        "Job Role": "JobRole",
+        "Job_Role": "JobRole",
+        "Job Level": "JobLevel",
+        "Job_Level": "JobLevel",
+        # Income
+        "Monthly Income": "MonthlyIncome",
+        "Monthly_Income": "MonthlyIncome",
+        "Salary": "MonthlyIncome",
+        "monthly_salary": "MonthlyIncome",
+        # Tenure — 'Years at Company' and 'Company Tenure' both map here
+        "Years at Company": "YearsAtCompany",
+        "Years_at_Company": "YearsAtCompany",
+        "Company Tenure": "CompanyTenure",
+        "Tenure": "YearsAtCompany",
+        # Total experience
+        "Total Working Years": "TotalWorkingYears",
+        "Total_Working_Years": "TotalWorkingYears",
+        "TotalExperience": "TotalWorkingYears",
+        # Satisfaction
+        "Work-Life Balance": "WorkLifeBalance",
+        "Work Life Balance": "WorkLifeBalance",
+        "Job Satisfaction": "JobSatisfaction",
+        "Job_Satisfaction": "JobSatisfaction",
+        "Environment Satisfaction": "EnvironmentSatisfaction",
+        "Environment_Satisfaction": "EnvironmentSatisfaction",
+        # Other IBM HR fields
+        "Performance Rating": "PerformanceRating",
+        "Job Involvement": "JobInvolvement",
+        "Num Companies Worked": "NumCompaniesWorked",
+        "Number of Companies": "NumCompaniesWorked",
+        "Stock Option Level": "StockOptionLevel",
+        "Years Since Last Promotion": "YearsSinceLastPromotion",
+        "Years With Current Manager": "YearsWithCurrManager",
+        "Distance from Home": "DistanceFromHome",
+        "Distance From Home": "DistanceFromHome",
+        "Marital Status": "MaritalStatus",
+        "Percent Salary Hike": "PercentSalaryHike",
+        # OverTime
+        "Over Time": "OverTime",
+        "over_time": "OverTime",
+        "overtime": "OverTime",
+        "Overtime": "OverTime",
+        # ── New dataset specific aliases ──
+        "Number of Promotions": "NumberOfPromotions",
+        "Number of Dependents": "NumberOfDependents",
+        "Education Level": "EducationLevel",
+        "Company Size": "CompanySize",
+        "Remote Work": "RemoteWork",
+        "Leadership Opportunities": "LeadershipOpportunities",
+        "Innovation Opportunities": "InnovationOpportunities",
+        "Company Reputation": "CompanyReputation",
+        "Employee Recognition": "EmployeeRecognition",
+    }
+)
 
 # ── Attrition value sets ──
-ATTRITION_YES = {"yes", "1", "true", "left", "voluntary", "resigned", "quit", "churned", "attrited"}
-ATTRITION_NO = {"no", "0", "false", "stayed", "active", "current", "retained", "employed"}
+# Compared lowercased. Anything outside ATTRITION_YES (unknown labels, missing
+# values) normalizes to "No"; ATTRITION_NO documents the recognised stay labels.
+ATTRITION_YES = frozenset(
+    {"yes", "1", "true", "left", "voluntary", "resigned", "quit", "churned", "attrited"}
+)
+ATTRITION_NO = frozenset(
+    {"no", "0", "false", "stayed", "active", "current", "retained", "employed"}
+)
+
+# OverTime values that encode to 1 (compared lowercased); everything else is 0.
+OVERTIME_YES = frozenset({"yes", "1", "true"})
+
+
+# Fuzzy column matching key: lowercase with spaces, underscores and hyphens removed.
+_FUZZY_STRIP = str.maketrans("", "", " _-")
+
+
+def _fuzzy_key(name: str) -> str:
+    return name.lower().translate(_FUZZY_STRIP)
+
+
+# Fuzzy key → required column name, built once at import.
+_REQUIRED_BY_FUZZY_KEY = {_fuzzy_key(c): c for c in REQUIRED_COLUMNS}
 
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -104,24 +131,32 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     Step 1 — Rename columns to match our schema.
     Uses exact alias match first, then fuzzy lowercase match.
     """
-    # Exact alias match
-    df = df.rename(columns=COLUMN_ALIASES)
+    # Exact alias match — only the aliases this upload actually uses.
+    exact = {c: COLUMN_ALIASES[c] for c in df.columns if c in COLUMN_ALIASES}
+    aliased = [exact.get(c, c) for c in df.columns]
 
     # Fuzzy match — strip spaces, underscores, hyphens + lowercase
     # Now we only target REQUIRED_COLUMNS, plus keeping any extra columns safe for aliasing.
-    our_cols = set(REQUIRED_COLUMNS)
-    df_col_normalized = {
-        c.lower().replace(" ", "").replace("_", "").replace("-", ""): c for c in df.columns
-    }
-    rename = {}
-    for target in our_cols:
-        if target in df.columns:
-            continue
-        key = target.lower().replace(" ", "").replace("_", "").replace("-", "")
-        if key in df_col_normalized:
-            rename[df_col_normalized[key]] = target
+    # One hashed lookup per (aliased) column; when several columns share a key the
+    # last one wins, as it always has.
+    present = set(aliased)
+    source_for = {}
+    for name in aliased:
+        target = _REQUIRED_BY_FUZZY_KEY.get(_fuzzy_key(name))
+        if target is not None and target not in present:
+            source_for[target] = name
+    fuzzy = {name: target for target, name in source_for.items()}
 
-    return df.rename(columns=rename)
+    # Both steps applied in a single in-place rename — like every other step of
+    # normalize_dataframe, this mutates the frame it is given (callers discard
+    # the raw upload frame), so no new frame or block copy is made.
+    rename = {}
+    for original, name in zip(df.columns, aliased):
+        final = fuzzy.get(name, name)
+        if final != original:
+            rename[original] = final
+    df.rename(columns=rename, inplace=True)
+    return df
 
 
 def normalize_attrition(df: pd.DataFrame) -> pd.DataFrame:
@@ -132,17 +167,10 @@ def normalize_attrition(df: pd.DataFrame) -> pd.DataFrame:
     if "Attrition" not in df.columns:
         return df
 
-    def map_val(val):
-        if pd.isna(val):
-            return "No"
-        v = str(val).strip().lower()
-        if v in ATTRITION_YES:
-            return "Yes"
-        if v in ATTRITION_NO:
-            return "No"
-        return "No"
-
-    df["Attrition"] = df["Attrition"].apply(map_val)
+    # Vectorized string pass + one set probe per row instead of a Python
+    # function call per row. NaN stringifies to "nan", which is not a yes → "No".
+    quit_mask = df["Attrition"].astype(str).str.strip().str.lower().isin(ATTRITION_YES)
+    df["Attrition"] = np.where(quit_mask, "Yes", "No").astype(object)
     return df
 
 
@@ -152,9 +180,14 @@ def encode_overtime(df: pd.DataFrame) -> pd.DataFrame:
     Defaults to 0 if column is missing.
     """
     if "OverTime" in df.columns:
-        df["overtime"] = df["OverTime"].apply(
-            lambda x: 1 if str(x).strip().lower() in {"yes", "1", "true"} else 0
-        )
+        overtime = df["OverTime"]
+        if overtime.dtype == bool:
+            df["overtime"] = overtime.astype("int8")
+        else:
+            # One vectorized string pass + hash probe; 0/1 fits in int8.
+            df["overtime"] = (
+                overtime.astype(str).str.strip().str.lower().isin(OVERTIME_YES).astype("int8")
+            )
         print("  >> OverTime encoded: overtime (1=Yes, 0=No)")
     else:
         df["overtime"] = 0
@@ -170,7 +203,9 @@ def build_schema_report(
     Since all core columns are strictly mandatory now, we just report
     whether the bonus features (overtime, travel) were found.
     """
-    overtime_active = bool("overtime" in df.columns and df["overtime"].sum() > 0)
+    # encode_overtime leaves a 0/1 int8 flag, so "any set" is the same test as
+    # sum() > 0 without widening into an int64 accumulator.
+    overtime_active = bool("overtime" in df.columns and df["overtime"].to_numpy().any())
 
     bonus_features = []
     if overtime_active:
@@ -202,14 +237,29 @@ def derive_missing_columns(df: pd.DataFrame) -> pd.DataFrame:
     # NumberOfPromotions → YearsSinceLastPromotion (inverse relationship:
     # more promotions ≈ promoted recently → fewer years since last promotion)
     if "YearsSinceLastPromotion" not in df.columns and "NumberOfPromotions" in df.columns:
-        promo = pd.to_numeric(df["NumberOfPromotions"], errors="coerce").fillna(0)
-        # Simple inversion: 0 promotions → ~3 years, 5+ → ~0 years
-        df["YearsSinceLastPromotion"] = (3 / (promo + 1)).round(0).astype(int)
+        promo = df["NumberOfPromotions"]
+        # Numeric uploads (the common case) skip the to_numeric converter pass.
+        if not pd.api.types.is_numeric_dtype(promo):
+            promo = pd.to_numeric(promo, errors="coerce")
+        promo = promo.fillna(0).to_numpy(dtype=np.float64)
+        # Simple inversion: 0 promotions → ~3 years, 5+ → ~0 years.
+        # np.rint rounds half-to-even, same as Series.round(0).
+        df["YearsSinceLastPromotion"] = np.rint(3.0 / (promo + 1.0)).astype(int)
         print("  >> YearsSinceLastPromotion: derived from NumberOfPromotions (inverted)")
 
     return df
 
 
+def _map_labels(values: pd.Series, mapping: dict) -> pd.Series:
+    """
+    mapping.get(str(x).strip().lower()) for every value, evaluated once per
+    distinct value rather than once per row — label columns have a handful of
+    levels, so the Python work is O(levels) instead of O(rows).
+    """
+    lookup = {u: mapping.get(str(u).strip().lower()) for u in values.unique()}
+    return values.map(lookup)
+
+
 def encode_satisfaction_scores(df: pd.DataFrame) -> pd.DataFrame:
     """
     Encode string satisfaction/rating columns to numeric 1-4 scale.
@@ -244,15 +294,20 @@ def encode_satisfaction_scores(df: pd.DataFrame) -> pd.DataFrame:
     for col in satisfaction_cols:
         if col not in df.columns:
             continue
+        # Already-numeric columns can't hold labels (no number stringifies to a
+        # level_map key), so skip the per-row coercion for them entirely.
+        if pd.api.types.is_numeric_dtype(df[col]):
+            continue
         # Check if any values are non-numeric (i.e., strings like 'Low', 'High')
         numeric_attempt = pd.to_numeric(df[col], errors="coerce")
         has_string_values = numeric_attempt.isna().any() and df[col].notna().any()
         if has_string_values:
-            encoded = df[col].apply(lambda x: level_map.get(str(x).strip().lower(), None))
+            encoded = _map_labels(df[col], level_map)
             mapped_mask = encoded.notna()
-            df[col] = df[col].where(~mapped_mask, encoded)  # only overwrite mapped rows
-            if mapped_mask.sum() > 0:
-                print(f"  >> {col}: {mapped_mask.sum()} string labels encoded to 1-4")
+            df[col] = df[col].mask(mapped_mask, encoded)  # only overwrite mapped rows
+            mapped = int(mapped_mask.to_numpy().sum())
+            if mapped > 0:
+                print(f"  >> {col}: {mapped} string labels encoded to 1-4")
     # -- Numeric satisfaction scale normalization --
     # Handles datasets where satisfaction columns are numeric but on a non-1-4 scale
     # (e.g. 1-5, 1-7, 1-10). These pass through string detection unchanged.
@@ -298,17 +353,14 @@ def encode_satisfaction_scores(df: pd.DataFrame) -> pd.DataFrame:
         "director": 5,
         "executive": 5,
     }
-    if "JobLevel" in df.columns:
+    if "JobLevel" in df.columns and not pd.api.types.is_numeric_dtype(df["JobLevel"]):
         numeric_attempt = pd.to_numeric(df["JobLevel"], errors="coerce")
         if numeric_attempt.isna().any() and df["JobLevel"].notna().any():
-            encoded = df["JobLevel"].apply(
-                lambda x: job_level_map.get(str(x).strip().lower(), None)
-            )
+            encoded = _map_labels(df["JobLevel"], job_level_map)
             mapped_mask = encoded.notna()
-            df["JobLevel"] = df["JobLevel"].where(~mapped_mask, encoded)
-            print(
-                f"  >> JobLevel: {mapped_mask.sum()} string tiers encoded (Entry=1 Mid=3 Senior=5)"
-            )
+            df["JobLevel"] = df["JobLevel"].mask(mapped_mask, encoded)
+            mapped = int(mapped_mask.to_numpy().sum())
+            print(f"  >> JobLevel: {mapped} string tiers encoded (Entry=1 Mid=3 Senior=5)")
 
     return df
 
@@ -317,6 +369,7 @@ def normalize_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, bool]:
     """
     Full normalization pipeline — call this in upload_routes.py.
     Returns (normalized_df, overtime_was_present).
+    Every step works on df in place; the returned frame is df itself.
     """
     df = normalize_columns(df)
     df = derive_missing_columns(df)  # handle dataset-specific derivations
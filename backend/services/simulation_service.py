@@ -4,8 +4,10 @@
 # Orchestration layer between API/workers and core simulation.
 # Routes and background tasks call this — never core directly.
 
-from backend.core.simulation.monte_carlo import run_monte_carlo
-from backend.core.simulation.policies import POLICIES, get_policy
+from dataclasses import replace
+
+from backend.core.simulation.policies import POLICY_NAMES, get_policy
+from backend.workers.pool import submit_monte_carlo
 
 
 def run_simulation_job(
@@ -23,16 +25,17 @@ def run_simulation_job(
     policy_config: if provided and policy_name == "custom", uses this dict
                    directly instead of reading from disk.
     """
-    if policy_name != "custom" and policy_name not in POLICIES:
+    if policy_name != "custom" and policy_name not in POLICY_NAMES:
         raise ValueError(f"Unknown policy: {policy_name}")
 
     config = get_policy(policy_name, config_override=policy_config)
     if duration_months is not None:
-        config.duration_months = duration_months
+        config = replace(config, duration_months=duration_months)
 
-    return run_monte_carlo(
+    # Runs in the simulation process pool; this (threadpool) caller just waits.
+    return submit_monte_carlo(
         config, runs=runs, policy_name=policy_name, seed=seed, session_id=session_id
-    )
+    ).result()
 
 
 def compare_simulation_jobs(
@@ -46,25 +49,28 @@ def compare_simulation_jobs(
     """
     Run two policies and return combined comparison result.
     """
-    if policy_a != "custom" and policy_a not in POLICIES:
+    if policy_a != "custom" and policy_a not in POLICY_NAMES:
         raise ValueError(f"Unknown policy: {policy_a}")
-    if policy_b != "custom" and policy_b not in POLICIES:
+    if policy_b != "custom" and policy_b not in POLICY_NAMES:
         raise ValueError(f"Unknown policy: {policy_b}")
 
     config_a = get_policy(policy_a)
     if duration_months is not None:
-        config_a.duration_months = duration_months
+        config_a = replace(config_a, duration_months=duration_months)
 
     config_b = get_policy(policy_b)
     if duration_months is not None:
-        config_b.duration_months = duration_months
+        config_b = replace(config_b, duration_months=duration_months)
 
-    result_a = run_monte_carlo(
+    # Submit both legs before waiting on either — wall time is max(a, b), not a + b.
+    future_a = submit_monte_carlo(
         config_a, runs=runs, policy_name=policy_a, seed=seed, session_id=session_id
     )
-    result_b = run_monte_carlo(
+    future_b = submit_monte_carlo(
         config_b, runs=runs, policy_name=policy_b, seed=seed, session_id=session_id
     )
+    result_a = future_a.result()
+    result_b = future_b.result()
 
     return {"policy_a": result_a, "policy_b": result_b}
 
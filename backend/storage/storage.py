@@ -12,6 +12,7 @@ import json
 from datetime import datetime
 
 import joblib
+import orjson
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 
@@ -29,6 +30,17 @@ def _decode_pkl(b64: str):
     return joblib.load(io.BytesIO(raw))
 
 
+def _encode_json(data) -> str:
+    """
+    Serialize a JSON artifact with orjson (C encoder, same float repr as json).
+    NumPy scalars and non-str keys are accepted like json.dumps accepted them;
+    non-finite floats are written as null, keeping the stored text valid JSON.
+    """
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode(
+        "utf-8"
+    )
+
+
 # ── public API ────────────────────────────────────────────────────────────────
 
 
@@ -48,7 +60,7 @@ def save_artifact(name: str, data, artifact_type: str, session_id: str = "global
     from backend.db.database import engine
     from backend.db.models import MLArtifact
 
-    encoded = _encode_pkl(data) if artifact_type == "pkl" else json.dumps(data)
+    encoded = _encode_pkl(data) if artifact_type == "pkl" else _encode_json(data)
 
     with Session(engine) as session:
         existing = session.exec(
@@ -96,3 +108,41 @@ def load_artifact(name: str, session_id: str = "global"):
     if row.artifact_type == "pkl":
         return _decode_pkl(row.data)
     return json.loads(row.data)
+
+
+def artifact_exists(name: str, session_id: str = "global") -> bool:
+    """
+    Cheap presence check — selects the key only, so the (possibly multi-MB)
+    base64 payload is never fetched or unpickled.
+    """
+    from sqlmodel import Session, select
+
+    from backend.db.database import engine
+    from backend.db.models import MLArtifact
+
+    with Session(engine) as session:
+        row = session.exec(
+            select(MLArtifact.name)
+            .where(MLArtifact.name == name, MLArtifact.session_id == session_id)
+            .limit(1)
+        ).first()
+    return row is not None
+
+
+def artifact_updated_at(name: str, session_id: str = "global") -> datetime | None:
+    """
+    Version stamp of an artifact (its last save time), or None if missing.
+    Lets long-lived processes tell whether a cached model/calibration is stale
+    without fetching the payload.
+    """
+    from sqlmodel import Session, select
+
+    from backend.db.database import engine
+    from backend.db.models import MLArtifact
+
+    with Session(engine) as session:
+        return session.exec(
+            select(MLArtifact.updated_at).where(
+                MLArtifact.name == name, MLArtifact.session_id == session_id
+            )
+        ).first()
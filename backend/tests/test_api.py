@@ -10,3 +10,43 @@ def test_cors_headers(client):
     )
     assert response.status_code == 200
     assert "access-control-allow-origin" in response.headers
+
+
+def test_run_simulation_requires_employees(client):
+    from unittest.mock import patch
+
+    # A trained model exists but this session has no uploaded employees
+    with (
+        patch("backend.storage.storage.artifact_exists", return_value=True),
+        patch("backend.storage.storage.load_artifact", return_value=None),
+    ):
+        response = client.post(
+            "/api/sim/run", json={"policy_name": "baseline"}, headers={"X-Session-ID": "empty"}
+        )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No employee data in database."
+
+
+def test_run_simulation_requires_trained_model(client):
+    response = client.post(
+        "/api/sim/run", json={"policy_name": "baseline"}, headers={"X-Session-ID": "untrained"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No trained model found."
+
+
+def test_validate_rejects_csv_missing_required_columns(client):
+    response = client.post(
+        "/api/upload/validate",
+        files={"file": ("tiny.csv", b"Age,Department\n30,Sales\n", "text/csv")},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Missing required columns")
+
+
+def test_run_simulation_rejects_unknown_policy(client):
+    from unittest.mock import patch
+
+    with patch("backend.storage.storage.artifact_exists", return_value=True):
+        response = client.post("/api/sim/run", json={"policy_name": "four_day_week_typo"})
+    assert response.status_code == 422
@@ -56,3 +56,88 @@ def test_create_simulation_job():
         # Cleanup
         session.delete(job)
         session.commit()
+
+
+def test_ingest_from_dataframe_replaces_session_rows():
+    import pandas as pd
+
+    from backend.upload import ingest_from_dataframe
+
+    row = {
+        "EmployeeID": 1,
+        "Department": "Sales",
+        "JobRole": "Sales Executive",
+        "JobLevel": 2,
+        "ManagerID": 0,
+        "Age": 30,
+        "MonthlyIncome": 5000,
+        "YearsAtCompany": 2,
+        "TotalWorkingYears": 5,
+        "NumCompaniesWorked": 2,
+        "PerformanceRating": 3,
+        "JobSatisfaction": 3,
+        "WorkLifeBalance": 3,
+        "EnvironmentSatisfaction": 3,
+        "JobInvolvement": 3,
+        "Attrition": "No",
+        "YearsSinceLastPromotion": 1,
+        "YearsWithCurrManager": 1,
+    }
+    bad_row = dict(row, EmployeeID=2, Age="not-a-number")
+    df = pd.DataFrame([row, dict(row, EmployeeID=3, ManagerID=1), bad_row])
+
+    ingest_from_dataframe(df, session_id="test_ingest")
+    result = ingest_from_dataframe(df, session_id="test_ingest")  # re-upload replaces
+
+    assert result == {"ingested": 2, "skipped": 1}
+    with Session(engine) as session:
+        rows = session.exec(
+            select(Employee)
+            .where(Employee.session_id == "test_ingest")
+            .order_by(Employee.employee_id)
+        ).all()
+    assert [e.employee_id for e in rows] == [1, 3]
+    assert rows[0].manager_id is None
+    assert rows[1].manager_id == 1
+    assert rows[0].marital_status == "Unknown"
+
+
+def test_find_reusable_job_only_after_latest_training():
+    from datetime import datetime, timedelta, timezone
+
+    from backend.api.sim_routes import _find_reusable_job
+
+    trained_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with Session(engine) as session:
+        session.add(
+            SimulationJob(
+                job_type="training",
+                status="completed",
+                created_at=trained_at - timedelta(minutes=5),
+                updated_at=trained_at,
+                session_id="test_reuse",
+            )
+        )
+        for job_id, created, status in (
+            ("stale", -1, "completed"),
+            ("fresh", 1, "completed"),
+            ("orphaned", 2, "running"),  # worker died mid-job; never reused
+        ):
+            session.add(
+                SimulationJob(
+                    job_id=job_id,
+                    job_type="simulation",
+                    status=status,
+                    policy_name="baseline",
+                    runs=10,
+                    seed=42,
+                    created_at=trained_at + timedelta(minutes=created),
+                    session_id="test_reuse",
+                )
+            )
+        session.commit()
+
+    args = ("simulation", "baseline", 10, None, 42, None, "test_reuse")
+    assert _find_reusable_job(*args).job_id == "fresh"
+    assert _find_reusable_job("simulation", "baseline", 20, None, 42, None, "test_reuse") is None
+    assert _find_reusable_job(*args[:-1], "other_session") is None
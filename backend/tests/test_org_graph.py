@@ -43,3 +43,49 @@ def test_build_org_graph():
     # Manager should have edges to reports
     assert G.has_edge(2, 1)
     assert G.has_edge(3, 1)
+
+
+def test_neighbor_links_follow_graph_changes():
+    from backend.core.simulation.org_graph import OrgGraph
+
+    G = OrgGraph()
+    G.add_node(1, agent="a1")
+    G.add_node(2, agent="a2")
+    G.add_edge(1, 2, weight=0.7)
+
+    assert [(w, attrs["agent"]) for w, attrs in G.neighbor_links(1)] == [(0.7, "a2")]
+
+    # Re-pointing a node's agent (as Monte Carlo does per copy) needs no rebuild
+    G.nodes[2]["agent"] = "a2-copy"
+    assert G.neighbor_links(1)[0][1]["agent"] == "a2-copy"
+
+    # A new edge (a hire) refreshes both endpoints
+    G.add_node(3, agent="a3")
+    G.add_edge(3, 1, weight=0.9)
+    assert [w for w, _ in G.neighbor_links(1)] == [0.7, 0.9]
+    assert [w for w, _ in G.neighbor_links(3)] == [0.9]
+
+
+def test_clone_points_at_copied_agents_and_is_independent():
+    from types import SimpleNamespace
+
+    from backend.core.simulation.org_graph import OrgGraph
+
+    base_agents = [SimpleNamespace(employee_id=i) for i in (1, 2)]
+    G = OrgGraph()
+    for a in base_agents:
+        G.add_node(a.employee_id, agent=a)
+    G.add_edge(1, 2, weight=0.7)
+
+    copies = [SimpleNamespace(employee_id=i) for i in (1, 2)]
+    H = G.clone(copies)
+
+    assert H.nodes[1]["agent"] is copies[0]
+    assert G.nodes[1]["agent"] is base_agents[0]
+    assert list(H.neighbors(1)) == list(G.neighbors(1))
+
+    # Hires in a run don't leak into the base graph
+    H.add_node(3, agent="hire")
+    H.add_edge(3, 1, weight=0.9)
+    assert 3 not in G.nodes
+    assert list(G.neighbors(1)) == [2]
@@ -82,3 +82,58 @@ class TestRunTrainingTask:
         with patch("backend.workers.tasks.run_training_job", return_value=fake_result):
             result = run_training_task(job_id="train_1", quality_report=None)
         assert result == fake_result
+
+
+class TestPoolCacheRefresh:
+    def test_quit_model_cache_cleared_only_when_artifact_changes(self):
+        from backend.workers import pool
+
+        pool._artifact_versions.clear()
+        versions = iter(["m1", "c1", "m1", "c1", "m2", "c1"])
+        with (
+            patch(
+                "backend.storage.storage.artifact_updated_at",
+                side_effect=lambda name, sid: next(versions),
+            ),
+            patch("backend.core.simulation.agent.clear_quit_model_cache") as clear_model,
+        ):
+            pool._refresh_stale_caches("s")  # first job: nothing seen yet
+            pool._refresh_stale_caches("s")  # unchanged: keep cached model
+            pool._refresh_stale_caches("s")  # retrained
+        assert clear_model.call_count == 2
+        pool._artifact_versions.clear()
+
+
+class TestPoolThreadBudget:
+    @pytest.mark.parametrize(
+        ("cpus", "web_workers", "sim_workers", "expected"),
+        [
+            (8, 1, 8, 1),  # one pool covering every core
+            (8, 1, 2, 4),  # a small pool may use the spare cores
+            (8, 2, 4, 1),  # two pools already fill the host
+            (8, 17, 2, 1),  # oversubscribed: never less than one thread
+            (16, 2, 2, 4),
+        ],
+    )
+    def test_threads_budgeted_across_all_pools_on_host(
+        self, cpus, web_workers, sim_workers, expected
+    ):
+        from backend.workers import pool
+
+        assert pool._threads_per_worker(cpus, web_workers, sim_workers) == expected
+
+    def test_executor_passes_host_wide_budget_to_initializer(self):
+        from backend.workers import pool
+
+        pool.shutdown_executor()
+        with (
+            patch.object(pool, "_available_cpus", return_value=8),
+            patch.object(pool.settings, "web_concurrency", 2),
+            patch.object(pool.settings, "sim_workers", 0),
+            patch.object(pool, "ProcessPoolExecutor") as executor_cls,
+        ):
+            pool.get_executor()
+            pool._executor = None
+        kwargs = executor_cls.call_args.kwargs
+        assert kwargs["max_workers"] == 4
+        assert kwargs["initargs"] == (1,)
@@ -69,3 +69,62 @@ def test_run_simulation_with_agents(
             assert result["summary"]["initial_headcount"] == 1
             assert len(result["logs"]) == 1
             assert result["logs"][0]["month"] == 1
+
+
+def test_run_monte_carlo_aggregates_across_runs():
+    # Each run reports a different headcount; stats are taken per month across runs
+    from backend.core.simulation.monte_carlo import _AGGREGATED_METRICS, run_monte_carlo
+
+    run_values = iter([0.0, 1.0, 2.0])
+
+    def fake_run(config, agents, G, policy_name, seed, session_id, verbose):
+        assert verbose is False
+        month = {key: next(run_values) for key in _AGGREGATED_METRICS[:1]}
+        month.update({key: 0.0 for key in _AGGREGATED_METRICS[1:]})
+        return {
+            "logs": [dict(month, month=1), dict(month, month=2)],
+            "summary": {"initial_headcount": 10, "final_headcount": 8, "total_quits": 2},
+        }
+
+    with (
+        patch("backend.core.simulation.monte_carlo.load_base_agents", return_value=([], None)),
+        patch("backend.core.simulation.monte_carlo.build_org_graph", return_value=MagicMock()),
+        patch("backend.core.simulation.monte_carlo.run_simulation", side_effect=fake_run),
+        patch("backend.storage.storage.load_artifact", return_value=None),
+    ):
+        result = run_monte_carlo(SimulationConfig(duration_months=2), runs=3, seed=0)
+
+    assert len(result["results"]) == 2
+    headcount = result["results"][1]["headcount"]
+    assert headcount == {"mean": 1.0, "min": 0.0, "max": 2.0, "std": 0.8165}
+    assert result["summary"]["period_attrition_pct"] == round(2 / 9 * 100, 2)
+
+
+def test_load_base_agents_cached_per_dataset_version():
+    from backend.core.simulation import time_engine
+
+    time_engine.clear_base_agents_cache()
+    with (
+        patch.object(time_engine, "get_dataset_version", side_effect=["v1", "v1", "v2"]),
+        patch.object(time_engine, "load_agents_from_db", side_effect=[["a"], ["b"]]) as load,
+    ):
+        assert time_engine.load_base_agents("s") == (["a"], "v1")
+        assert time_engine.load_base_agents("s") == (["a"], "v1")  # cache hit
+        assert time_engine.load_base_agents("s") == (["b"], "v2")  # new upload
+    assert load.call_count == 2
+    time_engine.clear_base_agents_cache()
+
+
+def test_productivity_decay_vec_matches_scalar():
+    import numpy as np
+
+    from backend.core.ml.productivity_decay import productivity_decay, productivity_decay_vec
+
+    rng = np.random.default_rng(0)
+    stress, fatigue = rng.random(200), rng.random(200)
+    js, wlb = rng.uniform(1, 4, 200), rng.uniform(1, 4, 200)
+    for workload in (0.9, 1.0, 1.4):
+        expected = [
+            productivity_decay(s, f, j, w, workload) for s, f, j, w in zip(stress, fatigue, js, wlb)
+        ]
+        assert productivity_decay_vec(stress, fatigue, js, wlb, workload).tolist() == expected
@@ -1,7 +1,8 @@
 # backend/upload.py
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import insert, text
 from sqlmodel import Session
 
 from backend.db.database import engine, init_db
@@ -9,6 +10,62 @@ from backend.db.models import Employee
 
 # ── Column definitions and normalization logic live in backend/schema.py ──
 
+# Columns cleaned as non-negative whole-number counts with missing values set to 0,
+# in audit order -> how the fill value is worded in the cleaning audit.
+_ZERO_FILLED_COUNT_COLUMNS = {
+    "YearsSinceLastPromotion": "0",
+    "YearsWithCurrManager": "0",
+    "StockOptionLevel": "0",
+    "DistanceFromHome": "0",
+    "PercentSalaryHike": "0%",
+    "YearsInCurrentRole": "0",
+}
+
+
+def _whole_numbers(
+    values: pd.Series, fill: float, lower: float = -np.inf, upper: float = np.inf
+) -> tuple[pd.Series, int, int]:
+    """
+    to_numeric -> round(0) -> fillna(fill) -> astype(int) -> clip(lower, upper)
+    worked in place on one float buffer instead of an intermediate Series per step.
+    Returns the int column plus its null count and out-of-range count (after the
+    fill, before the clip) for the cleaning audit.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        buf = values.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    else:
+        buf = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    missing = np.isnan(buf)
+    np.rint(buf, out=buf)  # half-to-even, same as Series.round(0)
+    buf[missing] = fill
+    _reject_non_finite(buf)  # inf input, or a NaN fill (e.g. median of an all-NaN column)
+    np.trunc(buf, out=buf)  # astype(int) drops the fraction of a .5 median fill
+    out_of_range = int(np.count_nonzero((buf < lower) | (buf > upper)))
+    np.clip(buf, lower, upper, out=buf)
+    whole = pd.Series(buf.astype(int), index=values.index, name=values.name)
+    return whole, int(missing.sum()), out_of_range
+
+
+def _reject_non_finite(values: np.ndarray) -> None:
+    # Checked after the fill: the clip would quietly turn +/-inf into a bound and
+    # the cast would turn NaN into INT64_MIN, where the old per-column
+    # astype(int) (cast before clip) refused both, so keep refusing.
+    if not np.isfinite(values).all():
+        raise pd.errors.IntCastingNaNError(
+            "Cannot convert non-finite values (NA or inf) to integer"
+        )
+
+
+def _normalize_labels(labels: pd.Series, case: str) -> pd.Series:
+    """
+    fillna("Unknown").str.strip().str.<case>() on a label column, run over its
+    distinct values only (a handful of departments/roles per upload) and
+    broadcast back through the factorize codes, instead of once per row.
+    """
+    codes, uniques = pd.factorize(labels.fillna("Unknown"))
+    cleaned = getattr(pd.Series(uniques, dtype=object).str.strip().str, case)()
+    return pd.Series(cleaned.to_numpy()[codes], index=labels.index)
+
 
 def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, int, int, dict, list[str]]:
     print("=== Cleaning data...")
@@ -40,33 +97,23 @@ def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, int, int, dict, lis
         print(f"  >> Removed {duplicates_removed} duplicate EmployeeIDs")
 
     # --- ManagerID ---
-    df["ManagerID"] = pd.to_numeric(df["ManagerID"], errors="coerce")
-    df["ManagerID"] = df["ManagerID"].round(0).fillna(0).astype(int)
+    df["ManagerID"], _, _ = _whole_numbers(df["ManagerID"], fill=0)
 
     # --- Age ---
     df["Age"] = pd.to_numeric(df["Age"], errors="coerce")
-    age_nulls = df["Age"].isna().sum()
     _median_age = df["Age"].median()
-    df["Age"] = df["Age"].round(0).fillna(_median_age).astype(int)
+    df["Age"], age_nulls, age_clipped = _whole_numbers(df["Age"], _median_age, 18, 80)
     if age_nulls > 0:
         cleaning_audit.append(
             f"Age: Filled {age_nulls} missing values with median ({_median_age:.0f})"
         )
-
-    age_clipped = ((df["Age"] < 18) | (df["Age"] > 80)).sum()
-    df["Age"] = df["Age"].clip(lower=18, upper=80)
     if age_clipped > 0:
         cleaning_audit.append(f"Age: Clipped {age_clipped} extreme values to [18, 80] range")
 
     # --- JobLevel ---
-    df["JobLevel"] = pd.to_numeric(df["JobLevel"], errors="coerce")
-    jl_nulls = df["JobLevel"].isna().sum()
-    df["JobLevel"] = df["JobLevel"].round(0).fillna(1).astype(int)
+    df["JobLevel"], jl_nulls, jl_clipped = _whole_numbers(df["JobLevel"], 1, 1, 5)
     if jl_nulls > 0:
         cleaning_audit.append(f"JobLevel: Filled {jl_nulls} missing values with 1 (Entry)")
-
-    jl_clipped = ((df["JobLevel"] < 1) | (df["JobLevel"] > 5)).sum()
-    df["JobLevel"] = df["JobLevel"].clip(lower=1, upper=5)
     if jl_clipped > 0:
         cleaning_audit.append(f"JobLevel: Clipped {jl_clipped} values to [1, 5] range")
 
@@ -86,115 +133,94 @@ def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, int, int, dict, lis
         cleaning_audit.append(f"MonthlyIncome: Clipped {mi_neg} negative values to $0")
 
     # --- YearsAtCompany ---
-    df["YearsAtCompany"] = pd.to_numeric(df["YearsAtCompany"], errors="coerce")
-    yac_nulls = df["YearsAtCompany"].isna().sum()
-    df["YearsAtCompany"] = df["YearsAtCompany"].round(0).fillna(0).astype(int)
+    df["YearsAtCompany"], yac_nulls, _ = _whole_numbers(df["YearsAtCompany"], 0, lower=0)
     if yac_nulls > 0:
         cleaning_audit.append(f"YearsAtCompany: Filled {yac_nulls} missing values with 0")
-    df["YearsAtCompany"] = df["YearsAtCompany"].clip(lower=0)
 
     # --- PerformanceRating ---
     if "PerformanceRating" in df.columns:
         df["PerformanceRating"] = pd.to_numeric(df["PerformanceRating"], errors="coerce")
-        pr_nulls = df["PerformanceRating"].isna().sum()
         _perf_mode = (
             int(df["PerformanceRating"].dropna().mode().iloc[0])
             if df["PerformanceRating"].notna().any()
             else 3
         )
-        df["PerformanceRating"] = df["PerformanceRating"].round(0).fillna(_perf_mode).astype(int)
+        df["PerformanceRating"], pr_nulls, _ = _whole_numbers(
+            df["PerformanceRating"], _perf_mode, 1, 4
+        )
         if pr_nulls > 0:
             cleaning_audit.append(
                 f"PerformanceRating: Filled {pr_nulls} missing values with mode ({_perf_mode})"
             )
-        df["PerformanceRating"] = df["PerformanceRating"].clip(lower=1, upper=4)
     else:
         df["PerformanceRating"] = 3  # Neutral default
 
     # --- JobInvolvement ---
     if "JobInvolvement" in df.columns:
         df["JobInvolvement"] = pd.to_numeric(df["JobInvolvement"], errors="coerce")
-        ji_nulls = df["JobInvolvement"].isna().sum()
         _inv_mode = (
             int(df["JobInvolvement"].dropna().mode().iloc[0])
             if df["JobInvolvement"].notna().any()
             else 3
         )
-        df["JobInvolvement"] = df["JobInvolvement"].round(0).fillna(_inv_mode).astype(int)
+        df["JobInvolvement"], ji_nulls, _ = _whole_numbers(df["JobInvolvement"], _inv_mode, 1, 4)
         if ji_nulls > 0:
             cleaning_audit.append(
                 f"JobInvolvement: Filled {ji_nulls} missing values with mode ({_inv_mode})"
             )
-        df["JobInvolvement"] = df["JobInvolvement"].clip(lower=1, upper=4)
     else:
         df["JobInvolvement"] = 3  # Neutral default
 
-    # --- YearsSinceLastPromotion ---
-    df["YearsSinceLastPromotion"] = pd.to_numeric(df["YearsSinceLastPromotion"], errors="coerce")
-    yslp_nulls = df["YearsSinceLastPromotion"].isna().sum()
-    df["YearsSinceLastPromotion"] = df["YearsSinceLastPromotion"].round(0).fillna(0).astype(int)
-    if yslp_nulls > 0:
-        cleaning_audit.append(f"YearsSinceLastPromotion: Filled {yslp_nulls} missing values with 0")
-    df["YearsSinceLastPromotion"] = df["YearsSinceLastPromotion"].clip(lower=0)
-
-    # --- YearsWithCurrManager ---
-    df["YearsWithCurrManager"] = pd.to_numeric(df["YearsWithCurrManager"], errors="coerce")
-    ywcm_nulls = df["YearsWithCurrManager"].isna().sum()
-    df["YearsWithCurrManager"] = df["YearsWithCurrManager"].round(0).fillna(0).astype(int)
-    if ywcm_nulls > 0:
-        cleaning_audit.append(f"YearsWithCurrManager: Filled {ywcm_nulls} missing values with 0")
-    df["YearsWithCurrManager"] = df["YearsWithCurrManager"].clip(lower=0)
-
-    # --- StockOptionLevel ---
-    df["StockOptionLevel"] = pd.to_numeric(df.get("StockOptionLevel", 0), errors="coerce")
-    sol_nulls = df["StockOptionLevel"].isna().sum()
-    df["StockOptionLevel"] = df["StockOptionLevel"].round(0).fillna(0).astype(int)
-    if sol_nulls > 0:
-        cleaning_audit.append(f"StockOptionLevel: Filled {sol_nulls} missing values with 0")
-    df["StockOptionLevel"] = df["StockOptionLevel"].clip(lower=0)
-
-    # --- DistanceFromHome ---
-    df["DistanceFromHome"] = pd.to_numeric(df.get("DistanceFromHome", 0), errors="coerce")
-    dfh_nulls = df["DistanceFromHome"].isna().sum()
-    df["DistanceFromHome"] = df["DistanceFromHome"].fillna(0).round(0).astype(int)
-    if dfh_nulls > 0:
-        cleaning_audit.append(f"DistanceFromHome: Filled {dfh_nulls} missing values with 0")
-    df["DistanceFromHome"] = df["DistanceFromHome"].clip(lower=0)
-
-    # --- PercentSalaryHike ---
-    df["PercentSalaryHike"] = pd.to_numeric(df.get("PercentSalaryHike", 0), errors="coerce")
-    psh_nulls = df["PercentSalaryHike"].isna().sum()
-    df["PercentSalaryHike"] = df["PercentSalaryHike"].fillna(0).round(0).astype(int)
-    if psh_nulls > 0:
-        cleaning_audit.append(f"PercentSalaryHike: Filled {psh_nulls} missing values with 0%")
-    df["PercentSalaryHike"] = df["PercentSalaryHike"].clip(lower=0)
-
-    # --- YearsInCurrentRole ---
-    df["YearsInCurrentRole"] = pd.to_numeric(df.get("YearsInCurrentRole", 0), errors="coerce")
-    yicr_nulls = df["YearsInCurrentRole"].isna().sum()
-    df["YearsInCurrentRole"] = df["YearsInCurrentRole"].round(0).fillna(0).astype(int)
-    if yicr_nulls > 0:
-        cleaning_audit.append(f"YearsInCurrentRole: Filled {yicr_nulls} missing values with 0")
-    df["YearsInCurrentRole"] = df["YearsInCurrentRole"].clip(lower=0)
+    # --- Count-style columns: missing -> 0, whole numbers, never negative ---
+    # One float matrix for all of them instead of a to_numeric/round/fillna/
+    # astype/clip chain per column, each allocating its own intermediate Series.
+    count_cols = list(_ZERO_FILLED_COUNT_COLUMNS)
+    counts = np.empty((len(df), len(count_cols)), dtype=np.float64)
+    for k, col in enumerate(count_cols):
+        if col not in df.columns:
+            counts[:, k] = 0.0
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            counts[:, k] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            counts[:, k] = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+    missing = np.isnan(counts)
+    count_nulls = missing.sum(axis=0)
+    counts[missing] = 0.0
+    _reject_non_finite(counts)
+    np.rint(counts, out=counts)  # half-to-even, same as Series.round(0)
+    np.maximum(counts, 0.0, out=counts)
+    df[count_cols] = pd.DataFrame(counts.astype(int), index=df.index, columns=count_cols)
+    for col, nulls in zip(count_cols, count_nulls):
+        if nulls > 0:
+            cleaning_audit.append(
+                f"{col}: Filled {nulls} missing values with {_ZERO_FILLED_COUNT_COLUMNS[col]}"
+            )
 
     # --- Fill nulls with median for float columns ---
     median_cols = [
-        "TotalWorkingYears",
-        "NumCompaniesWorked",
-        "JobSatisfaction",
-        "WorkLifeBalance",
-        "EnvironmentSatisfaction",
+        col
+        for col in (
+            "TotalWorkingYears",
+            "NumCompaniesWorked",
+            "JobSatisfaction",
+            "WorkLifeBalance",
+            "EnvironmentSatisfaction",
+        )
+        if col in df.columns
     ]
     for col in median_cols:
-        if col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors="coerce")
-            missing = df[col].isna().sum()
-            _med = df[col].median()
-            df[col] = df[col].fillna(_med)
-            if missing > 0:
-                cleaning_audit.append(
-                    f"{col}: Filled {missing} missing values with median ({_med:.1f})"
-                )
+    # Medians and null counts for the whole block in one call each, not per column.
+    medians = df[median_cols].median()
+    missing_counts = df[median_cols].isna().sum()
+    df[median_cols] = df[median_cols].fillna(medians)
+    for col in median_cols:
+        if missing_counts[col] > 0:
+            cleaning_audit.append(
+                f"{col}: Filled {missing_counts[col]} missing values with median "
+                f"({medians[col]:.1f})"
+            )
 
     # --- Clip satisfaction scores ---
     for col in ["JobSatisfaction", "WorkLifeBalance", "EnvironmentSatisfaction"]:
@@ -206,13 +232,13 @@ def clean_dataframe(df: pd.DataFrame) -> tuple[pd.DataFrame, int, int, dict, lis
     # --- Normalize string columns if present ---
     df["Attrition"] = df["Attrition"].fillna("No")
     if "Gender" in df.columns:
-        df["Gender"] = df["Gender"].fillna("Unknown").str.strip().str.capitalize()
+        df["Gender"] = _normalize_labels(df["Gender"], "capitalize")
     if "JobRole" in df.columns:
-        df["JobRole"] = df["JobRole"].fillna("Unknown").str.strip().str.title()
+        df["JobRole"] = _normalize_labels(df["JobRole"], "title")
     if "Department" in df.columns:
-        df["Department"] = df["Department"].fillna("Unknown").str.strip().str.title()
+        df["Department"] = _normalize_labels(df["Department"], "title")
     if "MaritalStatus" in df.columns:
-        df["MaritalStatus"] = df["MaritalStatus"].fillna("Unknown").str.strip().str.capitalize()
+        df["MaritalStatus"] = _normalize_labels(df["MaritalStatus"], "capitalize")
 
     # NOTE: OverTime is already encoded to `overtime` by schema.normalize_dataframe()
     # before clean_dataframe() is called — no re-encoding needed here.
@@ -225,40 +251,105 @@ def ingest_from_dataframe(df: pd.DataFrame, session_id: str = "global") -> dict:
     employees = []
     skipped = 0
 
-    records = df.to_dict("records")
-    for row in records:
+    # Column-wise: each column comes out once as a list of Python scalars and the
+    # rows are zipped back together — no per-row dict of all ~30 columns as with
+    # to_dict("records"). The per-field casts stay so a bad row is still skipped.
+    n = len(df)
+
+    def column(name, default=None):
+        if default is not None and name not in df.columns:
+            return [default] * n
+        return df[name].tolist()
+
+    rows = zip(
+        column("EmployeeID"),
+        column("Department"),
+        column("JobRole"),
+        column("JobLevel"),
+        column("ManagerID"),
+        column("Age"),
+        column("Gender", "Unknown"),
+        column("MonthlyIncome"),
+        column("YearsAtCompany"),
+        column("TotalWorkingYears"),
+        column("NumCompaniesWorked"),
+        column("PerformanceRating"),
+        column("JobSatisfaction"),
+        column("WorkLifeBalance"),
+        column("EnvironmentSatisfaction"),
+        column("JobInvolvement"),
+        column("Attrition"),
+        column("YearsSinceLastPromotion"),
+        column("YearsWithCurrManager"),
+        column("StockOptionLevel", 0),
+        column("MaritalStatus", "Unknown"),
+        column("DistanceFromHome", 0),
+        column("PercentSalaryHike", 0),
+        column("YearsInCurrentRole", 0),
+        column("overtime", 0),
+    )
+    for (
+        employee_id,
+        department,
+        job_role,
+        job_level,
+        manager_id,
+        age,
+        gender,
+        monthly_income,
+        years_at_company,
+        total_working_years,
+        num_companies_worked,
+        performance_rating,
+        job_satisfaction,
+        work_life_balance,
+        environment_satisfaction,
+        job_involvement,
+        attrition,
+        years_since_last_promotion,
+        years_with_curr_manager,
+        stock_option_level,
+        marital_status,
+        distance_from_home,
+        percent_salary_hike,
+        years_in_current_role,
+        overtime,
+    ) in rows:
         try:
-            mgr_id = int(row["ManagerID"])
+            mgr_id = int(manager_id)
             if mgr_id == 0:
                 mgr_id = None
 
-            emp = Employee(
-                employee_id=int(row["EmployeeID"]),
-                department=row["Department"],
-                job_role=row["JobRole"],
-                job_level=int(row["JobLevel"]),
+            # Plain dicts, not ORM instances: the whole batch goes out as one
+            # executemany INSERT (multi-row VALUES pages via insertmanyvalues)
+            # instead of the unit-of-work tracking and flushing N objects.
+            emp = dict(
+                employee_id=int(employee_id),
+                department=department,
+                job_role=job_role,
+                job_level=int(job_level),
                 manager_id=mgr_id,
                 simulation_id="master",
-                age=int(row["Age"]),
-                gender=row.get("Gender", "Unknown"),
-                monthly_income=int(row["MonthlyIncome"]),
-                years_at_company=int(row["YearsAtCompany"]),
-                total_working_years=float(row["TotalWorkingYears"]),
-                num_companies_worked=float(row["NumCompaniesWorked"]),
-                performance_rating=int(row["PerformanceRating"]),
-                job_satisfaction=float(row["JobSatisfaction"]),
-                work_life_balance=float(row["WorkLifeBalance"]),
-                environment_satisfaction=float(row["EnvironmentSatisfaction"]),
-                job_involvement=int(row["JobInvolvement"]),
-                attrition=row["Attrition"],
-                years_since_last_promotion=int(row["YearsSinceLastPromotion"]),
-                years_with_curr_manager=int(row["YearsWithCurrManager"]),
-                stock_option_level=int(row.get("StockOptionLevel", 0)),
-                marital_status=str(row.get("MaritalStatus", "Unknown")),
-                distance_from_home=int(row.get("DistanceFromHome", 0)),
-                percent_salary_hike=int(row.get("PercentSalaryHike", 0)),
-                years_in_current_role=int(row.get("YearsInCurrentRole", 0)),
-                overtime=int(row.get("overtime", 0)),
+                age=int(age),
+                gender=gender,
+                monthly_income=int(monthly_income),
+                years_at_company=int(years_at_company),
+                total_working_years=float(total_working_years),
+                num_companies_worked=float(num_companies_worked),
+                performance_rating=int(performance_rating),
+                job_satisfaction=float(job_satisfaction),
+                work_life_balance=float(work_life_balance),
+                environment_satisfaction=float(environment_satisfaction),
+                job_involvement=int(job_involvement),
+                attrition=attrition,
+                years_since_last_promotion=int(years_since_last_promotion),
+                years_with_curr_manager=int(years_with_curr_manager),
+                stock_option_level=int(stock_option_level),
+                marital_status=str(marital_status),
+                distance_from_home=int(distance_from_home),
+                percent_salary_hike=int(percent_salary_hike),
+                years_in_current_role=int(years_in_current_role),
+                overtime=int(overtime),
                 session_id=session_id,
             )
             employees.append(emp)
@@ -271,7 +362,8 @@ def ingest_from_dataframe(df: pd.DataFrame, session_id: str = "global") -> dict:
         session.exec(
             text("DELETE FROM employee WHERE session_id = :sid"), params={"sid": session_id}
         )
-        session.add_all(employees)
+        if employees:
+            session.exec(insert(Employee), params=employees)
         session.commit()
 
     print(f"[done] {len(employees)} employees ingested. Skipped: {skipped}")
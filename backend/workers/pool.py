@@ -0,0 +1,150 @@
+# backend/workers/pool.py
+
+# Process pool for CPU-bound simulation work.
+# Background tasks run in FastAPI's threadpool, so a long Monte Carlo run holds
+# the GIL and starves every other request (/policies, /status polling, ...).
+# Submitting run_monte_carlo to separate processes keeps the API responsive
+# and lets /compare run both policies on different cores at the same time.
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+
+from backend.config import settings
+
+_executor: ProcessPoolExecutor | None = None
+
+# Native thread pools that size themselves to every core by default: OpenMP
+# (XGBoost predict_proba) and the BLAS builds NumPy may link against.
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def _init_worker(threads: int):
+    """
+    Pool initializer. Each worker already is one unit of parallelism, so give
+    it an equal share of the cores — otherwise N workers × N OpenMP/BLAS
+    threads oversubscribe the machine and every simulation slows down.
+    Runs before the task imports NumPy/XGBoost, so the env vars take effect.
+    """
+    for var in _THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(threads))
+
+
+def _cgroup_cpu_quota() -> float | None:
+    """CPU limit from the container's cgroup (v2, then v1), or None if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def _available_cpus() -> int:
+    """
+    CPUs this process may actually use. os.cpu_count() reports the whole host,
+    but Cloud Run / `docker --cpus` enforce a cgroup quota, so sizing pools off
+    it runs many times more busy processes than the container gets cores.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available outside Linux
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, int(quota))
+    return max(1, cpus)
+
+
+def _threads_per_worker(cpus: int, web_workers: int, sim_workers: int) -> int:
+    """
+    Native threads per pool process. Every web worker owns a pool, so the host
+    runs web_workers × sim_workers simulation processes — budget against all
+    of them, not just this pool, or each process spins up cpus // sim_workers
+    OpenMP threads on cores its siblings in other pools are already using.
+    """
+    return max(1, cpus // (web_workers * sim_workers))
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Lazily create the shared pool — importing this module never spawns processes."""
+    global _executor
+    if _executor is None:
+        cpus = _available_cpus()
+        # Every web worker owns one of these pools; split the cores between them.
+        workers = settings.sim_workers or max(1, cpus // settings.web_concurrency)
+        # spawn, not fork: the parent holds a SQLAlchemy engine and threadpool
+        # threads, neither of which survive a fork safely.
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(_threads_per_worker(cpus, settings.web_concurrency, workers),),
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """Called from the app lifespan on shutdown."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# (artifact name, session_id) → updated_at seen when this worker last loaded it.
+_artifact_versions: dict[tuple[str, str], object] = {}
+
+
+def _refresh_stale_caches(session_id: str):
+    """
+    Pool workers are long-lived, so their lazy artifact caches would otherwise
+    keep serving the model/calibration from before a retrain. Compare each
+    artifact's updated_at (a key-only query) with what this worker last saw
+    and clear only what actually changed — the quit model is decoded once per
+    retrain, not once per job. Base agents and the org graph template are
+    keyed by dataset version and invalidate themselves.
+    """
+    from backend.core.simulation.agent import clear_quit_model_cache
+    from backend.core.simulation.behavior_engine import clear_calibration_cache
+    from backend.core.simulation.time_engine import clear_engine_calibration_cache
+    from backend.storage.storage import artifact_updated_at
+
+    def _changed(name: str) -> bool:
+        key = (name, session_id)
+        version = artifact_updated_at(name, session_id)
+        if key in _artifact_versions and _artifact_versions[key] == version:
+            return False
+        _artifact_versions[key] = version
+        return True
+
+    if _changed("quit_model"):
+        clear_quit_model_cache(session_id=session_id)
+    if _changed("calibration"):
+        clear_calibration_cache(session_id=session_id)
+        clear_engine_calibration_cache(session_id=session_id)
+
+
+def _run_monte_carlo_fresh(config, runs: int, policy_name: str, seed: int, session_id: str):
+    """Entry point executed inside a pool process."""
+    from backend.core.simulation.monte_carlo import run_monte_carlo
+
+    _refresh_stale_caches(session_id)
+    return run_monte_carlo(
+        config, runs=runs, policy_name=policy_name, seed=seed, session_id=session_id
+    )
+
+
+def submit_monte_carlo(config, runs: int, policy_name: str, seed: int, session_id: str) -> Future:
+    """Submit one Monte Carlo job. SimulationConfig is a plain dataclass, so it pickles."""
+    return get_executor().submit(
+        _run_monte_carlo_fresh, config, runs, policy_name, seed, session_id
+    )
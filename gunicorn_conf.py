@@ -0,0 +1,41 @@
+# gunicorn_conf.py
+# Production process manager config:
+#   gunicorn -c gunicorn_conf.py backend.main:app
+#
+# A single `uvicorn backend.main:app` is one interpreter and one event loop,
+# so every request shares one GIL. Gunicorn forks several Uvicorn workers;
+# job state lives in the DB, so any worker can serve /status for a job
+# started by another.
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Uvicorn workers are async, so a couple of them saturate on I/O long before
+# the CPU does; the cores belong to the simulation pools below.
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+
+# Heartbeat files on tmpfs — Docker's overlay /tmp can stall workers.
+worker_tmp_dir = "/dev/shm"
+
+# Heartbeat timeout. CPU-heavy threadpool work (large CSV cleaning, training)
+# competes with the event loop for the GIL, so give it headroom over 30s
+# before gunicorn decides the worker is hung.
+timeout = 120
+graceful_timeout = 30
+
+# Import the app once in the master and fork, so module-level state is
+# copy-on-write shared. Nothing opens DB connections or spawns the simulation
+# pool at import time (both happen lazily / in the lifespan), so this is
+# fork-safe.
+preload_app = True
+
+# Each web worker lazily owns a Monte Carlo process pool (backend/workers/pool.py),
+# so the host runs workers × SIM_WORKERS simulation processes. Publish the web
+# worker count so each pool defaults to max(1, cpus // workers) processes —
+# one per core across the host, counting the container's CPU quota rather
+# than os.cpu_count(). Set SIM_WORKERS to pin the per-pool size instead.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+accesslog = "-"
+errorlog = "-"